@@ -0,0 +1,14 @@
+# File where the results of the scrapers are persisted between runs (see 'scrape_cache.py')
+CACHE_NAME = "ScrapeCache.db"
+# Number of results kept in memory (the least recently used ones are dropped first)
+MAX_ENTRIES_IN_MEMORY = 1024
+
+DAY = 24 * 60 * 60
+# Seconds that the result of every source is valid. After that it's scraped again.
+TTL = {
+    "correos": 365 * DAY,
+    "ine_population": 90 * DAY,
+    "ine_transmisiones": 30 * DAY,
+    "catastro": 30 * DAY,
+    "catastro_report": 30 * DAY,
+}
@@ -0,0 +1,229 @@
+# Cache of the results of the scrapers, so the data that changes slowly (the C.P. of a
+# 'localizacion', the population of a locality, the transactions of a province, the data and
+# the reference value of a referencia catastral...) isn't scraped again on every land.
+# Re-running after a partial failure, or scraping lands of the same municipio, reads it from here.
+#
+# Every result is identified by (source, key), where 'key' is built from the inputs of the
+# scraper (normalized, see 'normalize_key'), and it's valid during the TTL of its source
+# (see 'constants.py'). The most recently used results are kept in memory (LRU), and all of
+# them are persisted on a SQLite file, so they survive between runs.
+#
+# It's used decorating the 'get_data' method of the scrapers with 'cached_scrape'.
+
+import atexit
+import functools
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import Cache.constants as const
+import logger_config
+from unidecode import unidecode
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeCache:
+    _shared_borg_state = {}
+    _init_lock = threading.Lock()
+
+    # Implementing Borg Singleton (same as 'DriverPool')
+    # Every scraper shares the same cache no matter where it's instantiated.
+    def __new__(cls, *args, **kwargs):
+        obj = super().__new__(cls)
+        obj.__dict__ = cls._shared_borg_state
+        return obj
+
+    def __init__(self, path=const.CACHE_NAME):
+        with ScrapeCache._init_lock:
+            # If the cache is already opened, it does nothing
+            if "connection" in self.__dict__:
+                return
+
+            # The scrapers of all the lands use it from different threads
+            self.lock = threading.Lock()
+            # Threads that don't read from the cache (see 'bypass')
+            self.bypassing = threading.local()
+            # (source, key) -> (pickled result, timestamp), the least recently used first
+            self.entries = OrderedDict()
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            sql = """
+                CREATE TABLE IF NOT EXISTS "results" (
+                    "source" TEXT NOT NULL,
+                    "key" TEXT NOT NULL,
+                    "result" BLOB NOT NULL,
+                    "created" REAL NOT NULL,
+                    PRIMARY KEY ("source", "key")
+                )
+                """
+            with self.connection:
+                self.connection.execute(sql)
+            self.__delete_expired()
+
+            atexit.register(self.close)
+
+    # Returns the result stored for the key, or None if it isn't stored, it's expired or the
+    # files it refers to were deleted
+    def get(self, source: str, key: str):
+        if getattr(self.bypassing, "active", False):
+            return None
+
+        with self.lock:
+            entry = self.entries.get((source, key))
+            if entry is None:
+                entry = self.connection.execute(
+                    'SELECT "result", "created" FROM "results" WHERE "source"=? AND "key"=?',
+                    (source, key),
+                ).fetchone()
+            if entry is None:
+                return None
+
+            pickled_result, created = entry
+            result = pickle.loads(pickled_result)
+            if ScrapeCache.__is_expired(source, created) or not files_exist(result):
+                self.__delete(source, key)
+                return None
+
+            self.__remember(source, key, entry)
+        # Every hit gets its own copy (it's unpickled), so the caller can modify it
+        return result
+
+    def put(self, source: str, key: str, result) -> None:
+        try:
+            entry = (pickle.dumps(result), time.time())
+        except Exception:
+            # Results that can't be pickled aren't cached, they'll be scraped again
+            return None
+
+        with self.lock:
+            with self.connection:
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO "results" ("source", "key", "result", "created") VALUES (?, ?, ?, ?)',
+                    (source, key, *entry),
+                )
+            self.__remember(source, key, entry)
+
+    # Returns every (not expired) result stored for the source, i.e. to build an offline index
+    # from what was already scraped (see 'Correos/build_postcode_index.py')
+    def get_all(self, source: str) -> list:
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT "result" FROM "results" WHERE "source"=? AND "created">=?',
+                (source, time.time() - const.TTL[source]),
+            ).fetchall()
+        return [pickle.loads(pickled_result) for pickled_result, in rows]
+
+    # Inside of the block, the scrapers of the current thread don't read from the cache
+    # (i.e. to check that the webpages still work), but their results are stored.
+    @contextmanager
+    def bypass(self):
+        self.bypassing.active = True
+        try:
+            yield self
+        finally:
+            self.bypassing.active = False
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+    ################################### PRIVATE METHODS ############################################
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+
+    # Keeps the entry in memory as the most recently used, dropping the least recently used one
+    def __remember(self, source: str, key: str, entry: tuple) -> None:
+        self.entries[(source, key)] = entry
+        self.entries.move_to_end((source, key))
+        if len(self.entries) > const.MAX_ENTRIES_IN_MEMORY:
+            self.entries.popitem(last=False)
+
+    def __delete(self, source: str, key: str) -> None:
+        self.entries.pop((source, key), None)
+        with self.connection:
+            self.connection.execute(
+                'DELETE FROM "results" WHERE "source"=? AND "key"=?', (source, key)
+            )
+
+    # The expired results are deleted from the file when the cache is opened
+    def __delete_expired(self) -> None:
+        now = time.time()
+        with self.connection:
+            for source, ttl in const.TTL.items():
+                self.connection.execute(
+                    'DELETE FROM "results" WHERE "source"=? AND "created"<?',
+                    (source, now - ttl),
+                )
+
+    @staticmethod
+    def __is_expired(source: str, created: float) -> bool:
+        return time.time() - created > const.TTL[source]
+
+
+# Decorator of the 'get_data' methods of the scrapers.
+#   - source: Name of the scraper (its TTL is on 'constants.TTL').
+#   - key: Function that returns the inputs of the scraper that identify its result (given the
+#          instance, i.e. lambda self: (self.ref,)).
+#   - is_valid: Function that tells if the result is a success. Failures aren't cached.
+# When the result is cached, the webpage isn't scraped (and no browser is borrowed).
+def cached_scrape(source: str, key, is_valid=lambda result: result is not None):
+
+    # Validate the data types of our arguments
+    assert source in const.TTL, f"Source {source} must be in {list(const.TTL)}"
+
+    def decorator(get_data):
+        @functools.wraps(get_data)
+        def wrapper(self, *args, **kwargs):
+            cache = ScrapeCache()
+            cache_key = normalize_key(key(self))
+            result = cache.get(source, cache_key)
+            if result is not None:
+                # Log
+                msg = f"Result of '{source}' for '{cache_key}' read from the cache (not scraped)."
+                logger.info(
+                    f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}"
+                )
+                return result
+
+            result = get_data(self, *args, **kwargs)
+            if is_valid(result):
+                cache.put(source, cache_key, result)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+# The same input may be written in different ways ('A Coruña', 'A CORUNA ', 'a  coruña'...)
+def normalize_key(values: tuple) -> str:
+    return "|".join(" ".join(unidecode(str(value)).lower().split()) for value in values)
+
+
+# Checks that every absolute path of the value (nested on dicts/lists too) exists.
+# A result (or output of a step) that refers to files already deleted can't be reused.
+def files_exist(value) -> bool:
+    if isinstance(value, (str, os.PathLike)):
+        return not os.path.isabs(value) or os.path.exists(value)
+    if isinstance(value, dict):
+        return all(files_exist(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(files_exist(item) for item in value)
+    return True
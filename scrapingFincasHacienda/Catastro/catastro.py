@@ -1,15 +1,17 @@
-# Class that inherits from a Selenium class. Given the referencia catastral of a property,
-# it downloads the KML, and scrapes some data
+# Class that borrows a Selenium session from the driver pool. Given the referencia catastral of a property,
+# it downloads the KML, and scrapes some data.
+# With the HTTP backend the data and the KML are requested directly (see 'catastro_http.py'),
+# and the browser is only used for them as a fallback.
 
 import logging
-import os
-import time
 from typing import Union
 
 import Catastro.constants as const
 import logger_config
 import regex
-from selenium import webdriver
+from Cache.scrape_cache import cached_scrape
+from Catastro.catastro_http import CatastroHttp
+from Driver.driver_pool import PooledChrome
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
@@ -17,13 +19,20 @@ from selenium.webdriver.support.ui import WebDriverWait
 logger = logging.getLogger(__name__)
 
 
-class Catastro(webdriver.Chrome):
+class Catastro(PooledChrome):
 
     # Class attribute to store all instances
     all = []
 
     def __init__(
-        self, delegation: int, lote: int, land: int, ref: str, mode="BASIC", debug=False
+        self,
+        delegation: int,
+        lote: int,
+        land: int,
+        ref: str,
+        mode="BASIC",
+        backend="HTTP",
+        debug=False,
     ):  # ref -> referencia catastral
 
         # Validate the data types of our arguments
@@ -32,35 +41,25 @@ class Catastro(webdriver.Chrome):
         assert land > 0, f"Land {land} is not greater than zero!"
         assert isinstance(ref, str), f"Ref {ref} must be a string!"
         assert isinstance(debug, bool), f"Debug {debug} must be a boolean!"
+        assert (
+            backend in const.BACKENDS
+        ), f"Backend {backend} must be in {const.BACKENDS}"
 
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option("detach", True)
-        options.add_argument("--disable-search-engine-choice-screen")
-        options.add_experimental_option("excludeSwitches", ["enable-logging"])
-        options.add_experimental_option(
-            "prefs",
-            {
-                "download.default_directory": str(const.DOWNLOAD_DIR),
-                "download.prompt_for_download": False,  # To automatically save files to the specified directory without asking
-                "download.directory_upgrade": True,
-                "safebrowsing.enabled": True,
-            },
-        )
-        super().__init__(options=options)
-        self.implicitly_wait(30)
-        self.maximize_window()
+        super().__init__(download_dir=const.DOWNLOAD_DIR, implicit_wait=30)
         self.delegation = delegation
         self.lote = lote
         self.land = land
         self.ref = ref
         self.debug = debug
         self.mode = mode
+        self.backend = backend
+        self.is_on_data_page = False
 
         # Append new instance to the class attribute list
         Catastro.all.append(self)
 
     def __repr__(self):
-        return f"Catastro({self.delegation}, {self.lote}, {self.land}, '{self.ref}', '{self.debug}')"
+        return f"Catastro({self.delegation}, {self.lote}, {self.land}, '{self.ref}', '{self.backend}', '{self.debug}')"
 
     def __str__(self):
         return (
@@ -69,6 +68,7 @@ class Catastro(webdriver.Chrome):
             f"  Lote: {self.lote}\n"
             f"  Land: {self.land}\n"
             f"  Ref: {self.ref}\n"
+            f"  Backend: {self.backend}\n"
             f"  Debug: {self.debug}"
         )
 
@@ -81,18 +81,11 @@ class Catastro(webdriver.Chrome):
     #    2) Coordinates
     def get_data(self) -> dict[str, Union[dict[str, dict[str, str]], str]]:
         try:
-            self.__land_first_page()
-            self.__search()
-            data = self.__scrape()
-            path_ortofoto = self.__download_ortofoto()
-            path_kml = self.__download_kml()
-
-            # To provent GoogleMaps bot detection, basically we avoided it
-            if self.mode == "ADVANCED":
-                coordinates = self.__get_coordenates_google_maps()
+            data, path_kml = self.__get_data_and_kml()
+            path_ortofoto, coordinates = self.__get_ortofoto_and_coordinates()
+            if coordinates:
                 coordinates_msg_part = f"with coordinates '{coordinates}' "
             else:
-                coordinates = ""
                 coordinates_msg_part = ""
             # Log
             msg = f"Successfully downloaded PDF and KML of the land '{self.ref}' {coordinates_msg_part} and data: {data}."
@@ -116,8 +109,69 @@ class Catastro(webdriver.Chrome):
             )
         finally:
             if self.debug == False:
-                self.quit()
-                time.sleep(1)
+                self.release_driver()
+
+    # Same as 'get_data' but only the data and the KML, which are the inputs of the rest of
+    # scrapers. With the HTTP backend it doesn't use the browser at all.
+    # Returns a dictionary with 2 keys: data and kml
+    # The result is cached per ref (see 'Cache/scrape_cache.py')
+    @cached_scrape(
+        "catastro",
+        key=lambda self: (self.ref,),
+        is_valid=lambda info: info is not None and all(info.values()),
+    )
+    def get_land_data(self) -> dict[str, Union[dict[str, str], str]]:
+        try:
+            data, path_kml = self.__get_data_and_kml()
+
+            # Log
+            msg = f"Successfully downloaded KML of the land '{self.ref}' and data: {data}."
+            logger.info(
+                f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}"
+            )
+            return {"data": data, "kml": path_kml}
+
+        except Exception:
+
+            # Log
+            msg = f"Failed to get data from land '{self.ref}'"
+            logger.error(
+                f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}",
+                exc_info=True,
+            )
+        finally:
+            if self.debug == False:
+                self.release_driver()
+
+    # The rest of 'get_data', always with Selenium.
+    # Returns a dictionary with 2 keys: ortofoto and coordinates
+    def get_media(self) -> dict[str, str]:
+        try:
+            path_ortofoto, coordinates = self.__get_ortofoto_and_coordinates()
+
+            # Log
+            msg = f"Successfully downloaded ortofoto of the land '{self.ref}'."
+            logger.info(
+                f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}"
+            )
+            return {"ortofoto": path_ortofoto, "coordinates": coordinates}
+
+        except Exception:
+
+            # Log
+            msg = f"Failed to get ortofoto from land '{self.ref}'"
+            logger.error(
+                f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}",
+                exc_info=True,
+            )
+        finally:
+            if self.debug == False:
+                self.release_driver()
+
+    # The data page is opened on the borrowed session, so a new session doesn't have it
+    def release_driver(self) -> None:
+        super().release_driver()
+        self.is_on_data_page = False
 
     #
     #
@@ -135,6 +189,41 @@ class Catastro(webdriver.Chrome):
     #
     #
 
+    # With the HTTP backend, Selenium is only used if the direct requests fail
+    def __get_data_and_kml(self) -> tuple[dict[str, str], str]:
+        data = path_kml = None
+        if self.backend == "HTTP":
+            catastro_http = CatastroHttp(
+                self.delegation, self.lote, self.land, self.ref
+            )
+            data = catastro_http.get_data()
+            path_kml = catastro_http.download_kml()
+
+        if data is None:
+            self.__open_data_page()
+            data = self.__scrape()
+        if path_kml is None:
+            path_kml = self.__download_kml()
+        return data, path_kml
+
+    def __get_ortofoto_and_coordinates(self) -> tuple[str, str]:
+        self.__open_data_page()
+        path_ortofoto = self.__download_ortofoto()
+
+        # To provent GoogleMaps bot detection, basically we avoided it
+        if self.mode == "ADVANCED":
+            coordinates = self.__get_coordenates_google_maps()
+        else:
+            coordinates = ""
+        return path_ortofoto, coordinates
+
+    # Let the instance on the webpage that shows data about the ref (only the first time)
+    def __open_data_page(self) -> None:
+        if not self.is_on_data_page:
+            self.__land_first_page()
+            self.__search()
+            self.is_on_data_page = True
+
     # Lands on the main Catastro webpage
     def __land_first_page(self) -> None:
         self.get(const.BASE_URL_SEARCH_CATASTRO)
@@ -155,27 +244,15 @@ class Catastro(webdriver.Chrome):
     # Given the webpage that shows data about the ref, it scrapes some info
     # It returns a dictionary with four keys.
     def __scrape(self) -> dict[str, str]:
-        localizacion = self.find_element(
-            By.XPATH,
-            "//div[@id='ctl00_Contenido_tblInmueble']//span[text()='Localización']/following-sibling::div//label",
-        ).text
-        provincia = regex.search(r".*\((.*)\)", localizacion).group(1)
+        localizacion = self.find_element(By.XPATH, const.XPATH_LOCALIZACION).text
+        provincia = regex.search(const.PROVINCIA_PATTERN, localizacion).group(1)
         municipio = regex.search(
-            r".*(?:\.|\d{5}) (.+)\(", localizacion, flags=regex.DOTALL
+            const.MUNICIPIO_PATTERN, localizacion, flags=regex.DOTALL
         ).group(1)
-        clase = self.find_element(
-            By.XPATH,
-            "//div[@id='ctl00_Contenido_tblInmueble']//span[text()='Clase']/following-sibling::*//label",
-        ).text
-        uso = self.find_element(
-            By.XPATH,
-            "//div[@id='ctl00_Contenido_tblInmueble']//span[text()='Uso principal']/following-sibling::*//label",
-        ).text
+        clase = self.find_element(By.XPATH, const.XPATH_CLASE).text
+        uso = self.find_element(By.XPATH, const.XPATH_USO).text
         if clase == "Rústico":
-            cultivo = self.find_element(
-                By.XPATH,
-                "//table[@id='ctl00_Contenido_tblCultivos']//tr[2]//td[2]/span",
-            ).text
+            cultivo = self.find_element(By.XPATH, const.XPATH_CULTIVO).text
         else:
             cultivo = None
         return {
@@ -234,11 +311,8 @@ class Catastro(webdriver.Chrome):
         google_earth_kml = self.find_element(
             By.XPATH, "//img[@id='ctl00_Contenido_btnGoogleEarth']"
         )
-        google_earth_kml.click()
-        # Give time to the KML to be downloaded, before trying
-        # to rename it, or do something with the file
-        Catastro.__wait_file_is_downloaded(const.DOWNLOAD_DIR)
-        path = self.__rename_file(self.ref, ".kml")
+        # Returns as soon as the KML is downloaded (named as the ref)
+        path = self.download_file(google_earth_kml.click, f"{self.ref}.kml")
 
         # Close focused window
         self.__close_current_window()
@@ -347,54 +421,11 @@ class Catastro(webdriver.Chrome):
             new_window_handle = self.window_handles[-1]
             self.switch_to.window(new_window_handle)
 
-    # We use static methods when we want to do something that is not unique per instance,
-    # but it should do something that has a relationship with the class
-    @staticmethod
-    def __wait_file_is_downloaded(download_dir, timeout=60, poll_interval=0.5):
-        """
-        Waits until a new file appears in download_dir
-        """
-        before = set(os.listdir(download_dir))
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            after = set(os.listdir(download_dir))
-            new_files = after - before
-            if new_files:
-                # Wait until files are fully downloaded
-                completed_files = [f for f in new_files if not f.endswith("crdownload")]
-                if completed_files:
-                    return 0  # Success exit status code
-            time.sleep(poll_interval)
-        raise TimeoutError("No new file downloaded within timeout")
-
     def __wait_until_canvas_is_loaded(self, timeout=30):
         WebDriverWait(self, 30).until(
             EC.invisibility_of_element((By.XPATH, "//div[@id='CargandoImagen']"))
         )
 
-    # Change the name of the most recent file that is on the destination directory
-    # And puts as the name the ref_catastral.
-    @staticmethod
-    def __rename_file(ref: str, ext: str) -> None:
-
-        # Validate the data types of our arguments
-        assert isinstance(ref, str), f"Ref {ref} must be a string!"
-        assert isinstance(ext, str), f"Ext {ext} must be a string!"
-
-        # Get the most recent file from the destination directory
-        most_recent_file = max(
-            [
-                os.path.join(const.DOWNLOAD_DIR, f)
-                for f in os.listdir(const.DOWNLOAD_DIR)
-            ],
-            key=os.path.getctime,
-        )
-
-        # Establish the variable that helds the new path
-        new_file_path = os.path.join(const.DOWNLOAD_DIR, ref + ext)
-        os.rename(most_recent_file, new_file_path)
-        return new_file_path
-
     # When called it takes a screenshot of the web, and save it with the filename
     # that we pass as an argument
     def __my_get_screenshot(self, filename):
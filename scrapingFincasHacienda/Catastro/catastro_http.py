@@ -0,0 +1,206 @@
+# HTTP backend of the Catastro class. The data page of a referencia catastral is a plain GET
+# endpoint ('BASE_REF_CATASTRAL_URL'), so instead of driving a browser through the cookie
+# banners and the search form, the page is requested and parsed with lxml (same XPaths).
+# The KML is downloaded directly from the link of the 'Google Earth' button.
+# When any of them fails, the Catastro class falls back to Selenium.
+
+import logging
+import os
+from typing import Union
+from urllib.parse import urljoin
+
+import Catastro.constants as const
+import logger_config
+import regex
+import requests
+from lxml import html
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Session shared by every thread, so the connections to Catastro are reused
+session = requests.Session()
+session.headers.update(const.HTTP_HEADERS)
+session.mount(
+    "https://",
+    HTTPAdapter(pool_connections=1, pool_maxsize=const.HTTP_POOL_SIZE),
+)
+
+
+class CatastroHttp:
+
+    def __init__(self, delegation: int, lote: int, land: int, ref: str):
+
+        # Validate the data types of our arguments
+        assert delegation > 0, f"Delegation {delegation} is not greater than zero!"
+        assert lote > 0, f"Lote {lote} is not greater than zero!"
+        assert land > 0, f"Land {land} is not greater than zero!"
+        assert isinstance(ref, str), f"Ref {ref} must be a string!"
+
+        self.delegation = delegation
+        self.lote = lote
+        self.land = land
+        self.ref = ref
+
+    def __repr__(self):
+        return (
+            f"CatastroHttp({self.delegation}, {self.lote}, {self.land}, '{self.ref}')"
+        )
+
+    def __str__(self):
+        return (
+            f"CatastroHttp Object:\n"
+            f"  Delegation: {self.delegation}\n"
+            f"  Lote: {self.lote}\n"
+            f"  Land: {self.land}\n"
+            f"  Ref: {self.ref}"
+        )
+
+    # Returns the same dictionary as the Selenium scraper:
+    # localizacion, provincia, municipio, clase, uso and cultivo.
+    # Returns None if the page couldn't be downloaded or parsed.
+    def get_data(self) -> Union[dict[str, str], None]:
+        try:
+            page = CatastroHttp.__get_page(self.__build_data_url())
+            data = CatastroHttp.parse_data(page)
+
+            # Log
+            msg = f"Scraped data of the land '{self.ref}' with HTTP backend."
+            logger.debug(
+                f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}"
+            )
+            return data
+
+        except Exception:
+
+            # Log
+            msg = f"Failed to get data from land '{self.ref}' with HTTP backend, Selenium will be used instead."
+            logger.warning(
+                f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}",
+                exc_info=True,
+            )
+            return None
+
+    # Returns the path of the KML, or None if it couldn't be downloaded
+    def download_kml(self, download_dir=const.DOWNLOAD_DIR) -> Union[str, None]:
+        try:
+            url = f"{const.BASE_URL_OTROS_VISORES_GENERAL}{self.ref}"
+            kml_url = CatastroHttp.__find_kml_url(CatastroHttp.__get_page(url), url)
+
+            response = session.get(kml_url, timeout=const.HTTP_TIMEOUT)
+            response.raise_for_status()
+            if b"<kml" not in response.content[:1000]:
+                raise ValueError(f"Response of '{kml_url}' is not a KML")
+
+            path = os.path.join(download_dir, f"{self.ref}.kml")
+            with open(path, "wb") as file:
+                file.write(response.content)
+
+            # Log
+            msg = f"Downloaded KML of the land '{self.ref}' with HTTP backend."
+            logger.debug(
+                f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}"
+            )
+            return path
+
+        except Exception:
+
+            # Log
+            msg = f"Failed to download KML of the land '{self.ref}' with HTTP backend, Selenium will be used instead."
+            logger.warning(
+                f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}",
+                exc_info=True,
+            )
+            return None
+
+    # Given the data page of a ref (already parsed), it scrapes the same info as the Selenium scraper
+    @staticmethod
+    def parse_data(page) -> dict[str, str]:
+        localizacion = CatastroHttp.__get_text(page, const.XPATH_LOCALIZACION)
+        provincia = regex.search(const.PROVINCIA_PATTERN, localizacion).group(1)
+        municipio = regex.search(
+            const.MUNICIPIO_PATTERN, localizacion, flags=regex.DOTALL
+        ).group(1)
+        clase = CatastroHttp.__get_text(page, const.XPATH_CLASE)
+        uso = CatastroHttp.__get_text(page, const.XPATH_USO)
+        if clase == "Rústico":
+            cultivo = CatastroHttp.__get_text(page, const.XPATH_CULTIVO)
+        else:
+            cultivo = None
+        return {
+            "localizacion": localizacion,
+            "provincia": provincia,
+            "municipio": municipio,
+            "clase": clase,
+            "uso": uso,
+            "cultivo": cultivo,
+        }
+
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+    ################################### PRIVATE METHODS ############################################
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+
+    def __build_data_url(self) -> str:
+        if match := regex.search(const.REF_RUSTICA_PATTERN, self.ref):
+            provincia, municipio = match.groups()
+        else:
+            provincia, municipio = "", ""
+        return const.BASE_REF_CATASTRAL_URL.format(
+            provincia=provincia, municipio=municipio, ref_catastral=self.ref
+        )
+
+    @staticmethod
+    def __get_page(url: str):
+        response = session.get(url, timeout=const.HTTP_TIMEOUT)
+        response.raise_for_status()
+        return html.fromstring(response.content)
+
+    # Same text that Selenium returns: every <br> is a new line, and the whitespace is collapsed
+    @staticmethod
+    def __get_text(page, xpath: str) -> str:
+        elements = page.xpath(xpath)
+        if not elements:
+            raise ValueError(f"Element '{xpath}' not found")
+        element = elements[0]
+        for br in element.iter("br"):
+            br.tail = "\n" + (br.tail or "")
+        lines = [" ".join(line.split()) for line in element.text_content().splitlines()]
+        return "\n".join(line for line in lines if line)
+
+    # The 'Google Earth' button is a link (or its onclick opens one) to the KML
+    @staticmethod
+    def __find_kml_url(page, base_url: str) -> str:
+        elements = page.xpath(const.XPATH_GOOGLE_EARTH)
+        if not elements:
+            raise ValueError("Google Earth button not found")
+        button = elements[0]
+        anchor = next(button.iterancestors("a"), None)
+        candidates = [
+            button.get("href"),
+            anchor.get("href") if anchor is not None else None,
+            button.get("onclick"),
+            anchor.get("onclick") if anchor is not None else None,
+        ]
+        for candidate in filter(None, candidates):
+            # Links like '#' only exist to run the onclick
+            if candidate.startswith("#"):
+                continue
+            if candidate.startswith("javascript:") or "(" in candidate:
+                match = regex.search(const.URL_PATTERN, candidate)
+                if not match:
+                    continue
+                candidate = match.group(1)
+            return urljoin(base_url, candidate)
+        raise ValueError("Google Earth button has no link to the KML")
@@ -19,3 +19,23 @@ EMPTY_DICTIONARY = {
 BASE_URL_OTROS_VISORES_GENERAL = (
     "https://www1.sedecatastro.gob.es/Cartografia/BuscarParcelaInternet.aspx?refcat="
 )
+# XPaths of the data page of a referencia catastral (used by Selenium and HTTP backends)
+XPATH_LOCALIZACION = "//div[@id='ctl00_Contenido_tblInmueble']//span[text()='Localización']/following-sibling::div//label"
+XPATH_CLASE = "//div[@id='ctl00_Contenido_tblInmueble']//span[text()='Clase']/following-sibling::*//label"
+XPATH_USO = "//div[@id='ctl00_Contenido_tblInmueble']//span[text()='Uso principal']/following-sibling::*//label"
+XPATH_CULTIVO = "//table[@id='ctl00_Contenido_tblCultivos']//tr[2]//td[2]/span"
+XPATH_GOOGLE_EARTH = "//*[@id='ctl00_Contenido_btnGoogleEarth']"
+PROVINCIA_PATTERN = r".*\((.*)\)"
+MUNICIPIO_PATTERN = r".*(?:\.|\d{5}) (.+)\("
+URL_PATTERN = r"""['"]([^'"]+)['"]"""
+# Rústica refs start with the codes of the provincia and the municipio (i.e. '28079A00100001')
+# The rest of refs don't, so 'del' and 'mun' are sent empty
+REF_RUSTICA_PATTERN = r"^(\d{2})(\d{3})[A-Z]\d{8}"
+# HTTP backend
+BACKENDS = ["HTTP", "SELENIUM"]
+HTTP_TIMEOUT = 10
+HTTP_POOL_SIZE = 8
+HTTP_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
+    "Accept-Language": "es-ES,es;q=0.9",
+}
@@ -2,16 +2,15 @@
 # and downloads the price report PDF for a land
 import datetime
 import logging
-import os
 import sys
-import time
 from typing import Union
 
 import Catastro.constants as const
 import logger_config
 import pdfplumber
+from Cache.scrape_cache import cached_scrape
 from dotenv import dotenv_values
-from selenium import webdriver
+from Driver.driver_pool import PooledChrome
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select, WebDriverWait
@@ -27,7 +26,7 @@ current_date = datetime.datetime.now() - datetime.timedelta(days=365)
 formatted_date = current_date.strftime("%d/%m/%Y")
 
 
-class CatastroReport(webdriver.Chrome):
+class CatastroReport(PooledChrome):
 
     # Class attribute to store all instances
     all = []
@@ -44,22 +43,7 @@ class CatastroReport(webdriver.Chrome):
         assert isinstance(clase, str), f"Clase {clase} must be a string!"
         assert isinstance(debug, bool), f"Debug {debug} must be a boolean!"
 
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option("detach", True)
-        options.add_argument("--disable-search-engine-choice-screen")
-        options.add_experimental_option("excludeSwitches", ["enable-logging"])
-        options.add_experimental_option(
-            "prefs",
-            {
-                "download.default_directory": str(const.DOWNLOAD_DIR_REPORT),
-                "download.propmt_for_download": False,
-                "download.directory_upgrade": True,
-                "safebrowsing.enabled": True,
-            },
-        )
-        super().__init__(options=options)
-        self.implicitly_wait(15)
-        self.maximize_window()
+        super().__init__(download_dir=const.DOWNLOAD_DIR_REPORT, implicit_wait=15)
         self.delegation = delegation
         self.lote = lote
         self.land = land
@@ -85,6 +69,12 @@ class CatastroReport(webdriver.Chrome):
         )
 
     # Scrape the reference value and download the 'Report PDF' if the land is 'Rústico'
+    # The result is cached per ref (see 'Cache/scrape_cache.py')
+    @cached_scrape(
+        "catastro_report",
+        key=lambda self: (self.ref, self.clase),
+        is_valid=lambda info: info["value"] is not None,
+    )
     def get_data(self) -> dict[str, Union[float, dict[str, str]]]:
         try:
             self.__land_first_page()
@@ -123,8 +113,7 @@ class CatastroReport(webdriver.Chrome):
             return {"value": None, "data": const.EMPTY_DICTIONARY, "path": None}
         finally:
             if self.debug == False:
-                self.quit()
-                time.sleep(1)
+                self.release_driver()
 
     #
     #
@@ -238,54 +227,10 @@ class CatastroReport(webdriver.Chrome):
         download_pdf_button = self.find_element(
             By.XPATH, "//a[@id='ctl00_Contenido_ucPdf_LDescargaFichero']"
         )
-        download_pdf_button.click()
-        # Give time to the PDF to be downloaded, before trying
-        # to rename it, or do something with the file
-        CatastroReport.__wait_file_is_downloaded(const.DOWNLOAD_DIR_REPORT)
-        report_path = self.__rename_pdf(self.ref)
+        # Returns as soon as the PDF is downloaded (named as the ref)
+        report_path = self.download_file(download_pdf_button.click, f"{self.ref}.pdf")
         return report_path
 
-    # We use static methods when we want to do something that is not unique per instance,
-    # but it should do something that has a relationship with the class
-    @staticmethod
-    def __rename_pdf(ref_catastral: str) -> str:
-
-        # Validate the data types of our arguments
-        assert isinstance(
-            ref_catastral, str
-        ), f"Ref_catastral {ref_catastral} must be a string!"
-
-        # Get the most recent file from the pdf destination directory
-        most_recent_file = max(
-            [
-                os.path.join(const.DOWNLOAD_DIR_REPORT, f)
-                for f in os.listdir(const.DOWNLOAD_DIR_REPORT)
-            ],
-            key=os.path.getctime,
-        )
-        # Establish the variable that helds the new path
-        new_file_path = os.path.join(const.DOWNLOAD_DIR_REPORT, ref_catastral + ".pdf")
-        os.rename(most_recent_file, new_file_path)
-        return new_file_path
-
-    @staticmethod
-    def __wait_file_is_downloaded(download_dir, timeout=60, poll_interval=0.5):
-        """
-        Waits until a new file appears in download_dir
-        """
-        before = set(os.listdir(download_dir))
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            after = set(os.listdir(download_dir))
-            new_files = after - before
-            if new_files:
-                # Wait until files are fully downloaded
-                completed_files = [f for f in new_files if not f.endswith("crdownload")]
-                if completed_files:
-                    return 0  # Success exit status code
-            time.sleep(poll_interval)
-        raise TimeoutError("No new file downloaded within timeout")
-
     @staticmethod
     def __format_price(price: str) -> float:
         if not "€" in price:
@@ -0,0 +1,118 @@
+# Builds the offline index of postal codes ('constants.POSTCODE_INDEX_CSV', see 'postcode_index.py').
+#   1) Every C.P. and locality of Spain is read from the GeoNames postal codes ('constants.GEONAMES_URL',
+#      unzipped). So the index knows all the localities of a municipio, not only the ones already seen.
+#   2) GeoNames and Correos don't always spell the localities the same way, and the locality is
+#      inserted on database and searched on INE. So the localities (and provinces) that Correos
+#      already returned are taken with its spelling, and marked as confirmed ('correos' = "1"):
+#         - The results of Correos on the scrape cache ('ScrapeCache.db').
+#         - The lands already stored on database.
+#      Only the confirmed localities are served by the index. The rest are scraped from Correos,
+#      and they are confirmed the next time the index is built.
+#
+# Usage (from 'scrapingFincasHacienda'):
+#   python -m Correos.build_postcode_index <path of ES.txt> [path of the CSV]
+
+import csv
+import logging
+import sqlite3
+import sys
+from pathlib import Path
+
+import Correos.constants as const
+import Database.constants as db_const
+from Cache.scrape_cache import ScrapeCache
+from Correos.postcode_index import normalize_name
+
+logger = logging.getLogger(__name__)
+
+
+# Writes the index on 'path', and returns the number of (localities, confirmed localities)
+def build_postcode_index(
+    geonames_path, path=const.POSTCODE_INDEX_CSV
+) -> tuple[int, int]:
+    # (C.P., normalized locality) -> row
+    rows = read_geonames(geonames_path)
+
+    for spelling in read_correos_spellings():
+        key = (spelling["cp"], normalize_name(spelling["locality"]))
+        if key in rows:
+            rows[key].update(
+                locality=spelling["locality"],
+                province=spelling["province"],
+                correos="1",
+            )
+        # The lands of database also have the municipio, so they can be added
+        elif spelling.get("municipio"):
+            rows[key] = {**spelling, "correos": "1"}
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8", newline="") as file:
+        writer = csv.DictWriter(file, fieldnames=const.POSTCODE_INDEX_COLUMNS)
+        writer.writeheader()
+        writer.writerows(sorted(rows.values(), key=lambda row: row["cp"]))
+
+    confirmed = sum(row["correos"] == "1" for row in rows.values())
+
+    # Log
+    msg = f"Postcode index '{path}' built: {len(rows)} localities, {confirmed} of them spelled as Correos."
+    logger.info(msg)
+    return len(rows), confirmed
+
+
+# Returns the localities of GeoNames as {(C.P., normalized locality): row}
+def read_geonames(geonames_path) -> dict[tuple[str, str], dict[str, str]]:
+    rows = {}
+    with open(geonames_path, "r", encoding="utf-8", newline="") as file:
+        for values in csv.reader(file, delimiter="\t"):
+            row = {
+                column: values[position].strip()
+                for column, position in const.GEONAMES_COLUMNS.items()
+            }
+            row["cp"] = row["cp"].zfill(5)
+            row["correos"] = "0"
+            rows.setdefault((row["cp"], normalize_name(row["locality"])), row)
+    return rows
+
+
+# Returns the (cp, locality, province) that Correos already returned, and the municipio when
+# it's known (the lands of database)
+def read_correos_spellings() -> list[dict[str, str]]:
+    spellings = [
+        {"cp": data["cp"], "locality": data["locality"], "province": data["province"]}
+        for data in ScrapeCache().get_all("correos")
+        if data["cp"] and data["locality"]
+    ]
+
+    if Path(db_const.DB_NAME).exists():
+        sql = """
+            SELECT DISTINCT
+                "codigos_postales"."codigo_postal" AS "cp",
+                "localities"."locality" AS "locality",
+                "municipios"."municipio" AS "municipio",
+                "provinces"."province" AS "province"
+            FROM "fincas"
+            JOIN "codigos_postales" ON "fincas"."codigo_postal_id"="codigos_postales"."id"
+            JOIN "localities" ON "fincas"."locality_id"="localities"."id"
+            JOIN "municipios" ON "localities"."municipio_id"="municipios"."id"
+            JOIN "provinces" ON "localities"."province_id"="provinces"."id"
+            """
+        connection = sqlite3.connect(f"file:{db_const.DB_NAME}?mode=ro", uri=True)
+        connection.row_factory = sqlite3.Row
+        try:
+            spellings += [dict(row) for row in connection.execute(sql)]
+        finally:
+            connection.close()
+
+    return spellings
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(
+            f"Usage: python -m Correos.build_postcode_index <path of ES.txt (from {const.GEONAMES_URL})> [path of the CSV]"
+        )
+    n_localities, n_confirmed = build_postcode_index(*sys.argv[1:3])
+    print(
+        f"{n_localities} localities written, {n_confirmed} of them spelled as Correos."
+    )
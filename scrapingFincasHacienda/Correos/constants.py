@@ -1,6 +1,23 @@
+from pathlib import Path
+
 BASE_URL_CORREOS = "https://www.correos.es/es/es/herramientas/codigos-postales/detalle"
 EMPTY_DICTIONARY = {
     "cp": None,
     "province": None,
     "locality": None,
 }
+# Offline index of postal codes (see 'postcode_index.py'). CSV with a header row containing
+# (at least) the columns of POSTCODE_INDEX_COLUMNS, built with 'build_postcode_index.py'
+# (the format is the one of 'postcodes_sample.csv', whose rows aren't confirmed by Correos, so
+# the index doesn't resolve anything until it's built).
+#   - correos: "1" if the locality and province are spelled as Correos spells them, "0" if not
+POSTCODE_INDEX_CSV = Path("../data/correos/postcodes.csv").resolve()
+POSTCODE_INDEX_COLUMNS = ("cp", "locality", "municipio", "province", "correos")
+# GeoNames postal codes of Spain (CC BY 4.0), the source of every C.P. of the index.
+# Tab separated, without header: the columns used are the next ones (by position).
+GEONAMES_URL = "https://download.geonames.org/export/zip/ES.zip"
+GEONAMES_COLUMNS = {"cp": 1, "locality": 2, "province": 5, "municipio": 7}
+# Postal code inside of a Catastro 'localizacion'
+CP_PATTERN = r"(?<!\d)(\d{5})(?!\d)"
+# Articles of the names written after the name ('CORUÑA (A)', 'Coruña, A')
+TRAILING_ARTICLE_PATTERN = r"^(.+?)(?:,\s*|\s*\()(a|as|o|os|el|la|los|las|els|les)\)?$"
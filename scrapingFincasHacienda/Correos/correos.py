@@ -1,18 +1,18 @@
-# Class that inherits from a Selenium class. Given the direction of a land,
+# Class that borrows a Selenium session from the driver pool. Given the direction of a land,
 # it returns the postal code, the province and the locality
 
 import logging
-import time
 
 import Correos.constants as const
 import logger_config
-from selenium import webdriver
+from Cache.scrape_cache import cached_scrape
+from Driver.driver_pool import PooledChrome
 from selenium.webdriver.common.by import By
 
 logger = logging.getLogger(__name__)
 
 
-class Correos(webdriver.Chrome):
+class Correos(PooledChrome):
 
     # Class attribute to store all instances
     all = []
@@ -35,13 +35,7 @@ class Correos(webdriver.Chrome):
         assert isinstance(direction, str), f"Direction {direction} must be a string!"
         assert isinstance(debug, bool), f"Debug {debug} must be a boolean!"
 
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option("detach", True)
-        options.add_argument("--disable-search-engine-choice-screen")
-        options.add_experimental_option("excludeSwitches", ["enable-logging"])
-        super().__init__(options=options)
-        self.implicitly_wait(15)
-        self.maximize_window()
+        super().__init__(implicit_wait=15)
         self.delegation = delegation
         self.lote = lote
         self.land = land
@@ -68,6 +62,12 @@ class Correos(webdriver.Chrome):
 
     # If it works returns a dictionary containing keys with truthy values
     # If it doesnt works returns a dictionary containing keys with falsy values
+    # The result is cached per 'direction' (see 'Cache/scrape_cache.py')
+    @cached_scrape(
+        "correos",
+        key=lambda self: (self.direction,),
+        is_valid=lambda data: data != const.EMPTY_DICTIONARY,
+    )
     def get_data(self) -> dict[str, str]:
         try:
             self.__land_first_page()
@@ -93,8 +93,7 @@ class Correos(webdriver.Chrome):
             return const.EMPTY_DICTIONARY
         finally:
             if self.debug == False:
-                self.quit()
-                time.sleep(1)
+                self.release_driver()
 
     #
     #
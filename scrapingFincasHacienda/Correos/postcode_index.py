@@ -0,0 +1,170 @@
+# Offline index of the postal codes, so most lands get their C.P., province and locality
+# without opening the Correos webpage (see 'Correos' class, only used when the index misses).
+# It's loaded once from a CSV snapshot (see 'constants.POSTCODE_INDEX_CSV') into dictionaries:
+#   - By C.P.: The 'localizacion' of urban parcels already contains the C.P.
+#   - By municipio: The 'localizacion' of rustic parcels contains the municipio (and often the
+#     name of the place, that may be one of its localities).
+# The names are normalized (see 'normalize_name'), so 'A CORUÑA', 'CORUÑA (A)' and 'Coruña, A'
+# are the same municipio.
+# The index is built with 'build_postcode_index.py': every locality of GeoNames (so the localities
+# of a municipio are all of them), with the spelling of Correos for the ones it already returned.
+# Only those are served, so an index that wasn't built (i.e. 'postcodes_sample.csv', which only
+# shows the format) resolves nothing, and every land is scraped from Correos.
+
+import csv
+import logging
+import threading
+from collections import defaultdict
+
+import Correos.constants as const
+import logger_config
+import regex
+from unidecode import unidecode
+
+logger = logging.getLogger(__name__)
+
+
+class PostcodeIndex:
+    _shared_borg_state = {}
+    _init_lock = threading.Lock()
+
+    # Implementing Borg Singleton (same as 'DriverPool')
+    # The CSV is only read once per process, no matter where the index is instantiated.
+    def __new__(cls, *args, **kwargs):
+        obj = super().__new__(cls)
+        obj.__dict__ = cls._shared_borg_state
+        return obj
+
+    def __init__(self, path=const.POSTCODE_INDEX_CSV):
+        with PostcodeIndex._init_lock:
+            # If the index is already loaded, it does nothing
+            if "by_cp" in self.__dict__:
+                return
+
+            # C.P. -> localities, and municipio -> localities
+            # Where localities are {normalized locality: rows}
+            self.by_cp = defaultdict(lambda: defaultdict(list))
+            self.by_municipio = defaultdict(lambda: defaultdict(list))
+            self.__load(path)
+
+    def __repr__(self):
+        return f"PostcodeIndex({len(self.by_cp)} C.P., {len(self.by_municipio)} municipios)"
+
+    # Returns the same dictionary as 'Correos.get_data' (cp, province and locality),
+    # or None if the land can't be resolved without doubts (then Correos must be scraped)
+    def lookup(self, delegation, lote, land, ref, localizacion, municipio=None):
+        place = normalize_name(localizacion)
+        municipio = normalize_name(municipio)
+        row = None
+
+        cp = regex.search(const.CP_PATTERN, localizacion or "")
+        if cp:
+            row = PostcodeIndex.__choose_row(
+                self.by_cp.get(cp.group(1), {}), place, municipio
+            )
+        if row is None and municipio:
+            row = PostcodeIndex.__choose_row(
+                self.by_municipio.get(municipio, {}), place, municipio
+            )
+        if row is None:
+            return None
+
+        # The locality is inserted on database (and searched on INE), so it must be spelled
+        # as Correos does, otherwise it would be another locality
+        if row["correos"] != "1":
+            # Log
+            msg = f"Land '{ref}' is on '{row['locality']}' locality with C.P. {row['cp']}, but its spelling isn't confirmed by Correos yet, so it'll be scraped."
+            logger.info(f"{logger_config.build_id(delegation, lote, land)}{msg}")
+            return None
+
+        data = {
+            "cp": row["cp"],
+            "province": row["province"],
+            "locality": row["locality"],
+        }
+
+        # Log
+        msg = f"Land '{ref}' is in '{data['province']}' province. More precisely is on '{data['locality']}' locality with C.P. {data['cp']} (resolved from the postcode index)"
+        logger.info(f"{logger_config.build_id(delegation, lote, land)}{msg}")
+        return data
+
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+    ################################### PRIVATE METHODS ############################################
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+
+    def __load(self, path):
+        confirmed = 0
+        try:
+            with open(path, "r", encoding="utf-8", newline="") as file:
+                for row in csv.DictReader(file):
+                    confirmed += row["correos"].strip() == "1"
+                    row = {
+                        column: row[column].strip()
+                        for column in const.POSTCODE_INDEX_COLUMNS
+                    }
+                    locality = normalize_name(row["locality"])
+                    self.by_cp[row["cp"].zfill(5)][locality].append(row)
+                    self.by_municipio[normalize_name(row["municipio"])][
+                        locality
+                    ].append(row)
+        except FileNotFoundError:
+            # Log
+            msg = f"Postcode index '{path}' not found, every C.P. will be scraped from Correos."
+            logger.warning(msg)
+            return None
+
+        # Log
+        msg = f"Postcode index loaded: {len(self.by_cp)} C.P. of {len(self.by_municipio)} municipios, {confirmed} localities spelled as Correos."
+        logger.info(msg)
+        if not confirmed:
+            # Log
+            msg = f"Postcode index '{path}' has no locality spelled as Correos, so it won't resolve any land. Build it with 'python -m Correos.build_postcode_index'."
+            logger.warning(msg)
+
+    # Given the localities of the same C.P. or municipio, the locality of the land is:
+    #   1) The only one.
+    #   2) The one whose name is on the 'localizacion' (the longest one, if several are),
+    #      apart from the municipio (which is always on the 'localizacion').
+    #   3) The one named as the municipio (its capital).
+    # If it's doubtful, or the locality has several C.P. (a city, it depends on the street), None.
+    @staticmethod
+    def __choose_row(localities, place, municipio):
+        on_place = [
+            locality
+            for locality in localities
+            if locality != municipio and f" {locality} " in f" {place} "
+        ]
+        if len(localities) == 1:
+            locality = next(iter(localities))
+        elif on_place:
+            locality = max(on_place, key=len)
+        elif municipio in localities:
+            locality = municipio
+        else:
+            return None
+
+        rows = localities[locality]
+        if len({row["cp"] for row in rows}) > 1:
+            return None
+        return rows[0]
+
+
+# Lowercase, without accents nor punctuation, and the article before the name
+def normalize_name(name) -> str:
+    name = " ".join(unidecode(str(name or "")).lower().split())
+    match = regex.match(const.TRAILING_ARTICLE_PATTERN, name)
+    if match:
+        name = f"{match.group(2)} {match.group(1)}"
+    return " ".join(regex.sub(r"[^\w\s]", " ", name).split())
@@ -8,6 +8,41 @@ DEBUG_COLUMNS_PATTERN = regex.compile(r".+?\((.+)\)\s+VALUES\s", regex.DOTALL)
 DB_NAME = {"HACIENDA": "FincasHacienda.db", "TXT": "FincasTXT.db"}.get(
     config["PURPOSE"]
 )
+# The media files (ortofotos, maps, reports...) are stored on a separate database, attached
+# to the connection as 'media'. The tables only store their SHA-256 (see 'models/media.py').
+MEDIA_DB_NAME = {"HACIENDA": "FincasHaciendaMedia.db", "TXT": "FincasTXTMedia.db"}.get(
+    config["PURPOSE"]
+)
+MEDIA_SCHEMA = "media"
+# Size of the chunks read and written to hash and store the files (streaming BLOB I/O)
+BLOB_CHUNK_SIZE = 1024 * 1024
+# The INSERT statements are checked (same columns as parameters) the first time they are run.
+# When "True", they are checked on every execution (development).
+STRICT_SQL_CHECKS = config.get("STRICT_SQL_CHECKS", "False") == "True"
+# Number of prepared statements that the connection keeps to reuse them
+CACHED_STATEMENTS = 256
+# Unique indexes of the natural keys (the columns used to check if a row is already stored)
+# (name, table, columns)
+NATURAL_KEY_INDEXES = [
+    ("idx_fincas_referencia_catastral", "fincas", ("referencia_catastral",)),
+    ("idx_empresas_nif", "empresas", ("nif",)),
+    ("idx_localities_locality", "localities", ("locality", "municipio_id")),
+    ("idx_lotes_auction_lote", "lotes", ("auction_id", "lote_number")),
+    (
+        "idx_empresas_fincas_empresa_finca",
+        "empresas_fincas",
+        ("empresa_id", "finca_id"),
+    ),
+    ("idx_municipios_municipio", "municipios", ("municipio",)),
+    ("idx_provinces_province", "provinces", ("province",)),
+    ("idx_territorios_ath_number", "territorios", ("ath_number",)),
+    (
+        "idx_agrupacion_cultivos_agrupacion",
+        "agrupacion_cultivos",
+        ("agrupacion_cultivo",),
+    ),
+    ("idx_aprovechamientos_aprovechamiento", "aprovechamientos", ("aprovechamiento",)),
+]
 # Search line by line, and take everything before data type
 COLUMNS_PATTERN = regex.compile(r".+\"\s")
 EMPRESAS_HEADERS = """
@@ -57,14 +92,14 @@ FINCA_HEADERS = """
     "number_buildings" INTEGER,
     "slope" NUMERIC,
     "fls" NUMERIC,
-    "ortofoto" BLOB NOT NULL,
-    "kml" BLOB NOT NULL,
-    "google_maps" BLOB,
-    "curvas_nivel" BLOB,
-    "lidar" BLOB,
-    "usos_suelo" BLOB,
-    "hidrografia" BLOB,
-    "report_catastro" BLOB,
+    "ortofoto" TEXT NOT NULL,
+    "kml" TEXT NOT NULL,
+    "google_maps" TEXT,
+    "curvas_nivel" TEXT,
+    "lidar" TEXT,
+    "usos_suelo" TEXT,
+    "hidrografia" TEXT,
+    "report_catastro" TEXT,
     "datetime" NUMERIC NOT NULL DEFAULT CURRENT_TIMESTAMP,
 """
 EMPRESAS_FINCAS_HEADERS = """
@@ -74,8 +109,22 @@ EMPRESAS_FINCAS_HEADERS = """
     "time_on_car" INTEGER NOT NULL,
     "distance_on_foot" NUMERIC NOT NULL,
     "time_on_foot" INTEGER NOT NULL,
-    "route_screenshot" BLOB,
+    "route_screenshot" TEXT,
 """
+# Columns that store the SHA-256 of a file of the media store
+MEDIA_COLUMNS = {
+    "fincas": [
+        "ortofoto",
+        "kml",
+        "google_maps",
+        "curvas_nivel",
+        "lidar",
+        "usos_suelo",
+        "hidrografia",
+        "report_catastro",
+    ],
+    "empresas_fincas": ["route_screenshot"],
+}
 
 ALLOWED_CLASES = ["rústico", "urbano", "de características especiales"]
 ALLOWED_USOS = {
@@ -0,0 +1,79 @@
+# Schema migrations. The version of the schema of a database file is stored on its
+# 'user_version' pragma (0 on new and old files). On startup every migration newer than that
+# version is applied, so the existing database files are upgraded in place.
+# To change the schema of the existing tables, append a function to 'MIGRATIONS'
+# (never modify the ones already released, they may have been applied).
+
+import logging
+import sqlite3
+
+import Database.constants as const
+from Database.models import Media
+
+logger = logging.getLogger(__name__)
+
+
+# 1. Indexes of the natural keys, so the "is it already stored" checks don't scan the tables
+def index_natural_keys(db):
+    for name, table, columns in const.NATURAL_KEY_INDEXES:
+        columns_sql = ", ".join(f'"{column}"' for column in columns)
+        try:
+            db.execute_query(
+                f'CREATE UNIQUE INDEX IF NOT EXISTS "{name}" ON "{table}" ({columns_sql})'
+            )
+        except sqlite3.IntegrityError:
+            # Databases created before this version may already contain duplicates.
+            # They aren't deleted (they could be referenced), the index is created anyway.
+            db.execute_query(
+                f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({columns_sql})'
+            )
+
+            # Log
+            msg = f"Table '{table}' contains duplicated {columns}, so its index '{name}' couldn't be UNIQUE."
+            logger.warning(msg)
+
+
+# 2. The files stored on BLOB columns are moved to the media store (replaced by their hash).
+# Files are streamed one by one, so they aren't loaded in memory.
+def move_media_to_media_store(db):
+    media = Media()
+    for table, columns in const.MEDIA_COLUMNS.items():
+        for column in columns:
+            db.execute_query(
+                f'SELECT "id" FROM "{table}" WHERE typeof("{column}") = \'blob\''
+            )
+            for (row_id,) in db.cursor.fetchall():
+                with db.connection.blobopen(
+                    table, column, row_id, readonly=True
+                ) as blob:
+                    file_hash = media.insert_stream(blob)
+                db.execute_query(
+                    f'UPDATE "{table}" SET "{column}"=:hash WHERE "id"=:id',
+                    {"hash": file_hash, "id": row_id},
+                )
+
+    # The space of the BLOBs is given back to the filesystem (it can't be done on a transaction)
+    db.run_after_commit(db.execute_query, "VACUUM main")
+
+
+MIGRATIONS = [index_natural_keys, move_media_to_media_store]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+# Applies the pending migrations (the tables must be already created).
+# Each migration and its version are committed together.
+def migrate(db):
+    version = get_schema_version(db)
+    for number, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+        with db.transaction():
+            migration(db)
+            db.execute_query(f"PRAGMA user_version = {number}")
+
+        # Log
+        msg = f"Database upgraded to schema version {number} ({migration.__name__})."
+        logger.info(msg)
+
+
+def get_schema_version(db):
+    db.execute_query("PRAGMA user_version")
+    return db.cursor.fetchone()[0]
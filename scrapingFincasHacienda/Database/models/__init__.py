@@ -12,6 +12,7 @@ from .empresa_finca import EmpresaFinca
 from .finca import Finca
 from .locality import Locality
 from .lote import Lote
+from .media import Media
 from .municipio import Municipio
 from .province import Province
 from .territorio import Territorio
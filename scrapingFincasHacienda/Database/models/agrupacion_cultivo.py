@@ -8,7 +8,8 @@ import regex
 
 class AgrupacionCultivo(Db.BaseDatabase):
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -26,17 +27,22 @@ class AgrupacionCultivo(Db.BaseDatabase):
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_agrupacion_cultivo_id(agrupacion_cultivo):
-            sql = 'INSERT INTO "agrupacion_cultivos" ("agrupacion_cultivo") VALUES (:agrupacion_cultivo)'
-            params = {"agrupacion_cultivo": agrupacion_cultivo}
-            self.execute_query(sql, params)
-
-    def get_agrupacion_cultivo_id(self, agrupacion_cultivo):
-        sql = 'SELECT id FROM "agrupacion_cultivos" WHERE "agrupacion_cultivo"=:agrupacion_cultivo'
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_agrupacion_cultivo_id(agrupacion_cultivo):
+            return row_id
+        sql = 'INSERT INTO "agrupacion_cultivos" ("agrupacion_cultivo") VALUES (:agrupacion_cultivo)'
         params = {"agrupacion_cultivo": agrupacion_cultivo}
         self.execute_query(sql, params)
-        result = self.cursor.fetchone()
-        return result["id"] if result else None
+        self.cache_id(
+            "agrupacion_cultivos", (agrupacion_cultivo,), self.cursor.lastrowid
+        )
+        return self.cursor.lastrowid
+
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
+    def get_agrupacion_cultivo_id(self, agrupacion_cultivo):
+        return self.get_cached_id(
+            "agrupacion_cultivos", ("agrupacion_cultivo",), (agrupacion_cultivo,)
+        )
 
     # def __delete_data(self): Won't have a method for deleting data because it has no sense for this dimension table
     # def __update_data(self): Won't have a method for updating data because it has no sense for this dimension table
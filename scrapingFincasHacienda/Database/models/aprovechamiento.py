@@ -8,7 +8,8 @@ import regex
 
 class Aprovechamiento(Db.BaseDatabase):  # Cultivo / aprovechamiento
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -26,19 +27,20 @@ class Aprovechamiento(Db.BaseDatabase):  # Cultivo / aprovechamiento
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_aprovechamiento_id(aprovechamiento):
-            sql = 'INSERT INTO "aprovechamientos" ("aprovechamiento") VALUES (:aprovechamiento)'
-            params = {"aprovechamiento": aprovechamiento}
-            self.execute_query(sql, params)
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_aprovechamiento_id(aprovechamiento):
+            return row_id
+        sql = 'INSERT INTO "aprovechamientos" ("aprovechamiento") VALUES (:aprovechamiento)'
+        params = {"aprovechamiento": aprovechamiento}
+        self.execute_query(sql, params)
+        self.cache_id("aprovechamientos", (aprovechamiento,), self.cursor.lastrowid)
+        return self.cursor.lastrowid
 
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
     def get_aprovechamiento_id(self, aprovechamiento):
-        sql = (
-            'SELECT id FROM "aprovechamientos" WHERE "aprovechamiento"=:aprovechamiento'
+        return self.get_cached_id(
+            "aprovechamientos", ("aprovechamiento",), (aprovechamiento,)
         )
-        params = {"aprovechamiento": aprovechamiento}
-        self.execute_query(sql, params)
-        result = self.cursor.fetchone()
-        return result["id"] if result else None
 
     # def __delete_data(self): Won't have a method for deleting data because it has no sense for this dimension table
     # def __update_data(self): Won't have a method for updating data because it has no sense for this dimension table
@@ -1,3 +1,4 @@
+import os
 import sqlite3
 from pathlib import Path
 
@@ -8,7 +9,8 @@ import regex
 
 class Auction(Db.BaseDatabase):
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -27,21 +29,29 @@ class Auction(Db.BaseDatabase):
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_auction_id(electronical_id):
-
-            # Get the binary contents of the PDF to insert them on the BLOB field
-            pliego_pdf = Db.BaseDatabase.read_binary(path_pdf)
-
-            sql = """
-                    INSERT INTO "auctions"
-                    ("electronical_id","pliego_pdf")
-                    VALUES (:electronical_id,:pliego_pdf)
-                    """
-            params = {
-                "electronical_id": electronical_id,
-                "pliego_pdf": pliego_pdf,
-            }
-            self.execute_query(sql, params)
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_auction_id(electronical_id):
+            return row_id
+
+        # The PDF is streamed to the BLOB field: an empty BLOB of its size is reserved,
+        # and then it's copied on chunks (see 'BaseDatabase.write_blob')
+        pliego_pdf_size = os.path.getsize(path_pdf) if path_pdf else None
+
+        sql = """
+                INSERT INTO "auctions"
+                ("electronical_id","pliego_pdf")
+                VALUES (:electronical_id, CASE WHEN :pliego_pdf IS NULL THEN NULL ELSE zeroblob(:pliego_pdf) END)
+                """
+        params = {
+            "electronical_id": electronical_id,
+            "pliego_pdf": pliego_pdf_size,
+        }
+        self.execute_query(sql, params)
+        auction_id = self.cursor.lastrowid
+        if path_pdf:
+            with open(path_pdf, "rb") as file:
+                self.write_blob("auctions", "pliego_pdf", auction_id, file)
+        return auction_id
 
     def get_auction_id(self, electronical_id):
         sql = 'SELECT "id" FROM auctions WHERE "electronical_id"=:electronical_id'
@@ -1,4 +1,6 @@
+import atexit
 import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
 
 import regex
@@ -8,6 +10,8 @@ import Database.constants as const
 
 class BaseDatabase:
     _shared_borg_state = {}
+    # Statements whose contract has already been checked (see '__check_insert_columns')
+    checked_statements = set()
 
     # Implementing Borg Singleton
     # State sharing for different instances. https://www.geeksforgeeks.org/singleton-pattern-in-python-a-complete-guide/
@@ -16,10 +20,49 @@ class BaseDatabase:
         obj.__dict__ = cls._shared_borg_state
         return obj
 
-    def __init__(self, db_name=const.DB_NAME):
-        self.connection = sqlite3.connect(db_name)
+    # There's only one connection per process. It's opened the first time the class is
+    # instantiated (or after closing it), the rest of instances reuse it.
+    def __init__(self, db_name=const.DB_NAME, media_db_name=const.MEDIA_DB_NAME):
+        self.open_connection(db_name, media_db_name)
+
+    def open_connection(self, db_name=const.DB_NAME, media_db_name=const.MEDIA_DB_NAME):
+        if not self.is_connection_closed():
+            return None
+        if "connection" not in self.__dict__:
+            atexit.register(self.close_connection)
+
+        # Statements are prepared once and reused (sqlite3 keeps a cache of them per connection).
+        # The connection is only used from the database thread (see 'run_in_db_thread').
+        self.connection = sqlite3.connect(
+            db_name,
+            cached_statements=const.CACHED_STATEMENTS,
+            check_same_thread=False,
+        )
         self.connection.row_factory = sqlite3.Row  # Enable named tuple access
         self.cursor = self.connection.cursor()
+        # The media store is on its own file, but on the same connection, so the media of a land
+        # is committed (or rolled back) on the same transaction as the land
+        self.cursor.execute(
+            "ATTACH DATABASE ? AS ?", (str(media_db_name), const.MEDIA_SCHEMA)
+        )
+        self.is_open = True
+        # Tables already created on this connection
+        self.created_tables = set()
+        # Identity map of the dimension tables (see 'get_cached_id')
+        self.id_cache = {}
+        # Affinities of the key columns of the cached tables (see '__normalize_key')
+        self.id_affinities = {}
+
+    # The CREATE TABLE (and the populate) of a table is only run the first time its class is
+    # instantiated, instead of on every instantiation
+    def create_table_once(self, *setup_functions):
+        self.open_connection()
+        table_class = type(self).__name__
+        if table_class in self.created_tables:
+            return None
+        for setup_function in setup_functions:
+            setup_function()
+        self.created_tables.add(table_class)
 
     # Two main variables:
     # 1) "columns": Refers to the columns specified on the query (a method is used get the columns from the query into a list)
@@ -28,37 +71,193 @@ class BaseDatabase:
     #                       params = {"aprovechamiento": aprovechamiento} # Esto de aqui
     #                       self.execute_query(sql, params)
 
+    # Outside of a transaction every statement is committed on its own.
+    # Inside of a transaction ('with self.transaction()') they are committed all together at the end.
     def execute_query(self, query, params=None):
-        with self.connection:
-            if not params:
-                self.cursor.execute(query)
-            else:
-                if "INSERT INTO" in query:
-                    columns_list = (
-                        regex.search(const.DEBUG_COLUMNS_PATTERN, query)
-                        .group(1)
-                        .replace('"', "")
-                    )
-                    columns_list = regex.split(r",\s*", columns_list)
-                    params_list = params.keys()
-                    assert len(columns_list) == len(params_list), (
-                        f"Mismatch between columns and parameters: "
-                        f"{len(columns_list)} columns vs {len(params_list)} parameters"
-                        f"{self.explain_differences_prepared_sql_statement(columns_list, list(params_list))}"
-                    )
-                self.cursor.execute(query, params)
+        if self.__dict__.get("transaction_depth"):
+            self.__execute_query(query, params)
+        else:
+            with self.connection:
+                self.__execute_query(query, params)
+
+    # Same as 'execute_query' for a statement that is run once per dictionary of 'params_list'
+    # (i.e. a bulk INSERT). All of them are sent at once (executemany) on one transaction.
+    def execute_many(self, query, params_list):
+        if not params_list:
+            return None
+        self.__check_insert_columns(query, params_list[0])
+        with self.transaction():
+            self.cursor.executemany(query, params_list)
+
+    # Unit of work: all the statements run inside the block are committed at once (one fsync),
+    # or none of them if an exception is raised. Nested blocks are part of the outer transaction.
+    @contextmanager
+    def transaction(self):
+        if self.__dict__.get("transaction_depth"):
+            self.transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self.transaction_depth -= 1
+            return
+
+        self.transaction_depth = 1
+        self.after_commit_functions = []
+        try:
+            with self.connection:
+                if not self.connection.in_transaction:
+                    self.connection.execute("BEGIN")
+                yield self
+        except BaseException:
+            # The ids inserted on the transaction no longer exist
+            self.id_cache.clear()
+            raise
+        finally:
+            self.transaction_depth = 0
+            after_commit_functions = self.after_commit_functions
+            self.after_commit_functions = []
+
+        # Only reached if the transaction was committed
+        for function, args in after_commit_functions:
+            function(*args)
+
+    # Runs the function once the current transaction is committed (i.e. delete files that are
+    # already stored). If the transaction is rolled back, it's never run.
+    def run_after_commit(self, function, *args):
+        if self.__dict__.get("transaction_depth"):
+            self.after_commit_functions.append((function, args))
+        else:
+            function(*args)
+
+    def __execute_query(self, query, params=None):
+        if not params:
+            self.cursor.execute(query)
+        else:
+            self.__check_insert_columns(query, params)
+            self.cursor.execute(query, params)
+
+    # The statements are built from static templates, so the contract of an INSERT (the same
+    # columns as parameters) only needs to be checked the first time it's run.
+    # The next executions just run it (unless STRICT_SQL_CHECKS is enabled).
+    def __check_insert_columns(self, query, params):
+        if query in BaseDatabase.checked_statements and not const.STRICT_SQL_CHECKS:
+            return None
+        if "INSERT INTO" in query:
+            columns_list = (
+                regex.search(const.DEBUG_COLUMNS_PATTERN, query)
+                .group(1)
+                .replace('"', "")
+            )
+            columns_list = regex.split(r",\s*", columns_list)
+            params_list = params.keys()
+            assert len(columns_list) == len(params_list), (
+                f"Mismatch between columns and parameters: "
+                f"{len(columns_list)} columns vs {len(params_list)} parameters"
+                f"{self.explain_differences_prepared_sql_statement(columns_list, list(params_list))}"
+            )
+            BaseDatabase.checked_statements.add(query)
+
+    # ================= Streaming BLOB I/O =================
+    # The BLOBs are written and read on chunks (incremental I/O), so the memory used doesn't
+    # depend on the size of the files. To write one, the row is inserted with 'zeroblob(size)'
+    # (a BLOB of the final size filled with zeros) and then the content is copied on top of it.
+    def write_blob(self, table, column, row_id, source, schema="main"):
+        with self.connection.blobopen(table, column, row_id, name=schema) as blob:
+            while chunk := source.read(const.BLOB_CHUNK_SIZE):
+                blob.write(chunk)
+
+    def export_blob(self, table, column, row_id, path, schema="main"):
+        with self.connection.blobopen(
+            table, column, row_id, readonly=True, name=schema
+        ) as blob:
+            with open(path, "wb") as file:
+                while chunk := blob.read(const.BLOB_CHUNK_SIZE):
+                    file.write(chunk)
+        return path
+
+    # ================= Identity map of the dimension tables =================
+    # The ids of the dimension tables are kept in memory (value -> id), so the lookups done
+    # while inserting a land don't touch SQLite. A table is loaded entirely the first time it's
+    # looked up (they are small), and every row inserted later is added by 'cache_id'.
+    # The fact-like tables, that grow with every auction ('auctions', 'lotes'), aren't cached.
+    # 'key_columns' are the columns that identify a row, and 'key' their values.
+    def get_cached_id(self, table, key_columns, key):
+        if table not in self.id_cache:
+            self.__load_ids(table, key_columns)
+        key = self.__normalize_key(table, key)
+        return self.id_cache[table].get(key) if key is not None else None
+
+    def cache_id(self, table, key, row_id):
+        # If the table isn't loaded yet, the row'll be read with the rest of the table
+        if table in self.id_cache:
+            key = self.__normalize_key(table, key)
+            if key is not None:
+                self.id_cache[table][key] = row_id
+
+    def __load_ids(self, table, key_columns):
+        self.cursor.execute(f'PRAGMA table_info("{table}")')
+        types = {row["name"]: row["type"] for row in self.cursor.fetchall()}
+        self.id_affinities[table] = [
+            BaseDatabase.__get_affinity(types.get(column, "")) for column in key_columns
+        ]
+
+        columns = ", ".join(f'"{column}"' for column in key_columns)
+        self.cursor.execute(f'SELECT "id", {columns} FROM "{table}"')
+        self.id_cache[table] = {}
+        for row in self.cursor.fetchall():
+            key = self.__normalize_key(table, tuple(row)[1:])
+            if key is not None:
+                self.id_cache[table][key] = row["id"]
+
+    # SQLite converts the value to the affinity of the column before comparing it (i.e.
+    # 'ath_number' is INTEGER but it's scraped as text, so '05' is the stored 5), and NULL
+    # is never equal to anything. The keys are converted the same way, and a key with a NULL
+    # (None) doesn't match any row.
+    def __normalize_key(self, table, key):
+        if any(value is None for value in key):
+            return None
+        return tuple(
+            BaseDatabase.__apply_affinity(value, affinity)
+            for value, affinity in zip(key, self.id_affinities[table])
+        )
+
+    # Affinity of a column given its declared type (https://www.sqlite.org/datatype3.html)
+    @staticmethod
+    def __get_affinity(declared_type):
+        declared_type = declared_type.upper()
+        if "INT" in declared_type:
+            return "INTEGER"
+        if any(name in declared_type for name in ("CHAR", "CLOB", "TEXT")):
+            return "TEXT"
+        if "BLOB" in declared_type or not declared_type:
+            return "BLOB"
+        if any(name in declared_type for name in ("REAL", "FLOA", "DOUB")):
+            return "REAL"
+        return "NUMERIC"
+
+    # The numbers are compared as Python numbers (5 == 5.0), so INTEGER, REAL and NUMERIC only
+    # have to convert the text that looks like a number
+    @staticmethod
+    def __apply_affinity(value, affinity):
+        if affinity == "TEXT" and isinstance(value, (int, float)):
+            return str(value)
+        if affinity in ("INTEGER", "REAL", "NUMERIC") and isinstance(value, str):
+            for number_type in (int, float):
+                try:
+                    return number_type(value)
+                except ValueError:
+                    pass
+        return value
 
     def close_connection(self):
-        if self.connection:
+        if self.__dict__.get("connection"):
             self.connection.close()
+            self.is_open = False
 
     # Method to check if the connection is closed
+    # (a flag instead of a query, because it's checked every time a table class is instantiated)
     def is_connection_closed(self):
-        try:
-            self.connection.execute("SELECT 1")
-            return False
-        except sqlite3.ProgrammingError:
-            return True
+        return not self.__dict__.get("is_open")
 
     #####
     ########
@@ -84,17 +283,6 @@ class BaseDatabase:
         )
         return msg
 
-    @staticmethod
-    def read_binary(path_binary_file):
-        # If the path to the binary file is empty.
-        # i.e. when a land doesnt have the report from the catastro
-        # the path_report_catastro'll be None
-        if not path_binary_file:
-            return None
-        with open(path_binary_file, "rb") as file:
-            binary_file = file.read()
-        return binary_file
-
     @staticmethod
     def remove_file_from_filesystem(path):
         if path:
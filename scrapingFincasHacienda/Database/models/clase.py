@@ -8,8 +8,8 @@ import regex
 
 class Clase(Db.BaseDatabase):
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
-        self.__populate_table()  # If the table is already populated, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table, self.__populate_table)
 
     def __create_table(self):
         sql = f"""
@@ -36,12 +36,11 @@ class Clase(Db.BaseDatabase):
         sql = 'INSERT INTO "clases" ("clase") VALUES (:clase)'
         params = {"clase": clase.lower()}
         self.execute_query(sql, params)
+        self.cache_id("clases", (clase.lower(),), self.cursor.lastrowid)
 
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
     def get_clase_id(self, clase):
-        sql = 'SELECT * FROM "clases" WHERE "clase"=:clase'
-        params = {"clase": clase.lower()}
-        self.execute_query(sql, params)
-        return self.cursor.fetchone()["id"]
+        return self.get_cached_id("clases", ("clase",), (clase.lower(),))
 
     # def __delete_data(self): Won't have a method for deleting data because
     # it's a dimension table that stores static data (CONSTANTS)
@@ -8,7 +8,8 @@ import regex
 
 class CodigoPostal(Db.BaseDatabase):  # Código Postal
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -26,21 +27,24 @@ class CodigoPostal(Db.BaseDatabase):  # Código Postal
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_codigo_postal_id(codigo_postal):
-            sql = """
-                    INSERT INTO "codigos_postales" 
-                    ("codigo_postal")
-                    VALUES (:codigo_postal)
-                    """
-            params = {"codigo_postal": codigo_postal}
-            self.execute_query(sql, params)
-
-    def get_codigo_postal_id(self, codigo_postal):
-        sql = 'SELECT "id" FROM "codigos_postales" WHERE "codigo_postal"=:codigo_postal'
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_codigo_postal_id(codigo_postal):
+            return row_id
+        sql = """
+                INSERT INTO "codigos_postales" 
+                ("codigo_postal")
+                VALUES (:codigo_postal)
+                """
         params = {"codigo_postal": codigo_postal}
         self.execute_query(sql, params)
-        result = self.cursor.fetchone()
-        return result["id"] if result else None
+        self.cache_id("codigos_postales", (codigo_postal,), self.cursor.lastrowid)
+        return self.cursor.lastrowid
+
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
+    def get_codigo_postal_id(self, codigo_postal):
+        return self.get_cached_id(
+            "codigos_postales", ("codigo_postal",), (codigo_postal,)
+        )
 
     # def __delete_data(self): Won't have a method for deleting data because it has no sense for this dimension table
     # def __update_data(self): Won't have a method for updating data because it has no sense for this dimension table
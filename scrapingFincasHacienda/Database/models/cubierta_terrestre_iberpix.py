@@ -10,7 +10,8 @@ class CubiertaTerrestreIberpix(
     Db.BaseDatabase
 ):  # Descripcion Cubierta Terrestre s/Iberpix
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -28,21 +29,28 @@ class CubiertaTerrestreIberpix(
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_cubierta_terrestre_id(cubierta_terrestre):
-            sql = """
-                    INSERT INTO "cubiertas_terrestres_iberpix" 
-                    ("cubierta_terrestre")
-                    VALUES (:cubierta_terrestre)
-                    """
-            params = {"cubierta_terrestre": cubierta_terrestre}
-            self.execute_query(sql, params)
-
-    def get_cubierta_terrestre_id(self, cubierta_terrestre):
-        sql = 'SELECT "id" FROM "cubiertas_terrestres_iberpix" WHERE "cubierta_terrestre"=:cubierta_terrestre'
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_cubierta_terrestre_id(cubierta_terrestre):
+            return row_id
+        sql = """
+                INSERT INTO "cubiertas_terrestres_iberpix" 
+                ("cubierta_terrestre")
+                VALUES (:cubierta_terrestre)
+                """
         params = {"cubierta_terrestre": cubierta_terrestre}
         self.execute_query(sql, params)
-        result = self.cursor.fetchone()
-        return result["id"] if result else None
+        self.cache_id(
+            "cubiertas_terrestres_iberpix", (cubierta_terrestre,), self.cursor.lastrowid
+        )
+        return self.cursor.lastrowid
+
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
+    def get_cubierta_terrestre_id(self, cubierta_terrestre):
+        return self.get_cached_id(
+            "cubiertas_terrestres_iberpix",
+            ("cubierta_terrestre",),
+            (cubierta_terrestre,),
+        )
 
     # def __delete_data(self): Won't have a method for deleting data because it has no sense for this dimension table
     # def __update_data(self): Won't have a method for updating data because it has no sense for this dimension table
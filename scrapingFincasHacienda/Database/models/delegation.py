@@ -8,8 +8,8 @@ import regex
 
 class Delegation(Db.BaseDatabase):
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
-        self.__populate_table()  # If the table is already populated, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table, self.__populate_table)
 
     def __create_table(self):
         sql = f"""
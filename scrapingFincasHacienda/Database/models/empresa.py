@@ -4,6 +4,7 @@ from pathlib import Path
 
 import Database.constants as const
 import Database.models.base_database as Db
+import pandas as pd
 import regex
 
 
@@ -18,7 +19,8 @@ class Empresa(Db.BaseDatabase):
     )
 
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -38,28 +40,53 @@ class Empresa(Db.BaseDatabase):
 
         # The for loop iterates over the rows of the DataFrame using itertuples
         # (index=False, name=None), which returns each row as a tuple
-        # without the index
+        # without the index. Each row is converted to a dictionary where keys are
+        # headers and values are row data
         headers = self.get_columns_names_list(
             "Empresa"
         )  # Get the headers from the dataframe
         headers = [header.replace('"', "") for header in headers]
-        for row in df.itertuples(index=False, name=None):
-            # Before inserting the data, check if already exists on the table
-            # If it doesn't exists, then proceed to insert it
-            if not self.get_empresa_id(row[1]):
-                # Create a dictionary where keys are headers and values are row data
-                row_dict = dict(zip(headers, row))
-                self.execute_query(sql, row_dict)
+        rows = [
+            dict(zip(headers, row)) for row in df.itertuples(index=False, name=None)
+        ]
+        # A missing NIF is NaN on the DataFrame, so it's stored and compared as None (NULL)
+        for row in rows:
+            if pd.isna(row["nif"]):
+                row["nif"] = None
+
+        # Before inserting the data, check which enterprises already exist on the table
+        # (one query for all of them), and only insert the rest (once each)
+        seen_nifs = self.get_stored_nifs([row["nif"] for row in rows])
+        new_rows = []
+        for row in rows:
+            if row["nif"] in seen_nifs:
+                continue
+            if row["nif"] is not None:
+                seen_nifs.add(row["nif"])
+            new_rows.append(row)
+
+        # All the new enterprises are inserted at once
+        self.execute_many(sql, new_rows)
+
+    # Returns the NIFs (of the given ones) that are already stored on the table
+    def get_stored_nifs(self, nifs):
+        nifs = [nif for nif in set(nifs) if pd.notna(nif)]
+        if not nifs:
+            return set()
+        placeholders = ", ".join("?" for _ in nifs)
+        sql = f'SELECT "nif" FROM empresas WHERE "nif" IN ({placeholders})'
+        self.execute_query(sql, nifs)
+        return {row["nif"] for row in self.cursor.fetchall()}
 
     def get_empresa_id(self, nif):
-        sql = 'SELECT "id" FROM empresas WHERE "Código NIF"=:nif'
+        sql = 'SELECT "id" FROM empresas WHERE "nif"=:nif'
         params = {"nif": nif}
         self.execute_query(sql, params)
         result = self.cursor.fetchone()
         return result["id"] if result else None
 
     def delete_data(self, nif):
-        sql = 'DELETE FROM empresas WHERE "Código NIF"=:nif'
+        sql = 'DELETE FROM empresas WHERE "nif"=:nif'
         params = {"nif": nif}
         self.execute_query(sql, params)
 
@@ -17,7 +17,8 @@ class EmpresaFinca(Db.BaseDatabase):
     )
 
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -37,9 +38,12 @@ class EmpresaFinca(Db.BaseDatabase):
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_empresa_finca_id(data["empresa_id"], data["finca_id"]):
-            sql = f'INSERT INTO "empresas_fincas" ({self.columns_names_insert_sql}) VALUES ({self.values_placeholders_sql})'
-            self.execute_query(sql, data)
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_empresa_finca_id(data["empresa_id"], data["finca_id"]):
+            return row_id
+        sql = f'INSERT INTO "empresas_fincas" ({self.columns_names_insert_sql}) VALUES ({self.values_placeholders_sql})'
+        self.execute_query(sql, data)
+        return self.cursor.lastrowid
 
     def get_empresa_finca_id(self, empresa_id, finca_id):
         sql = 'SELECT "id" FROM empresas_fincas WHERE empresa_id=:empresa_id AND finca_id=:finca_id'
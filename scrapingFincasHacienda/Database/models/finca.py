@@ -4,6 +4,7 @@ from pathlib import Path
 import Database.constants as const
 import Database.models.base_database as Db
 import regex
+from Database.models.media import Media
 
 
 class Finca(Db.BaseDatabase):
@@ -16,7 +17,8 @@ class Finca(Db.BaseDatabase):
     )
 
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -50,11 +52,16 @@ class Finca(Db.BaseDatabase):
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_finca_id(data["referencia_catastral"]):
-            for key, path in file_paths.items():
-                data[key] = Db.BaseDatabase.read_binary(path)
-            sql = f'INSERT INTO "fincas" ({self.columns_names_insert_sql}) VALUES ({self.values_placeholders_sql})'
-            self.execute_query(sql, data)
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_finca_id(data["referencia_catastral"]):
+            return row_id
+        # The files are stored on the media store, the row only keeps their hashes
+        media = Media()
+        for key, path in file_paths.items():
+            data[key] = media.insert_file(path)
+        sql = f'INSERT INTO "fincas" ({self.columns_names_insert_sql}) VALUES ({self.values_placeholders_sql})'
+        self.execute_query(sql, data)
+        return self.cursor.lastrowid
 
     def get_finca_id(self, ref):
         sql = 'SELECT "id" FROM fincas WHERE "referencia_catastral"=:ref'
@@ -8,7 +8,8 @@ import regex
 
 class Locality(Db.BaseDatabase):
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -34,27 +35,30 @@ class Locality(Db.BaseDatabase):
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_locality_id(locality, municipio_id):
-            sql = """
-                    INSERT INTO "localities" 
-                    ("locality", "municipio_id", "province_id", "population_now", "population_before") 
-                    VALUES (:locality, :municipio_id, :province_id, :population_now, :population_before)
-                    """
-            params = {
-                "locality": locality,
-                "municipio_id": municipio_id,
-                "province_id": province_id,
-                "population_now": population_now,
-                "population_before": population_before,
-            }
-            self.execute_query(sql, params)
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_locality_id(locality, municipio_id):
+            return row_id
+        sql = """
+                INSERT INTO "localities" 
+                ("locality", "municipio_id", "province_id", "population_now", "population_before") 
+                VALUES (:locality, :municipio_id, :province_id, :population_now, :population_before)
+                """
+        params = {
+            "locality": locality,
+            "municipio_id": municipio_id,
+            "province_id": province_id,
+            "population_now": population_now,
+            "population_before": population_before,
+        }
+        self.execute_query(sql, params)
+        self.cache_id("localities", (locality, municipio_id), self.cursor.lastrowid)
+        return self.cursor.lastrowid
 
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
     def get_locality_id(self, locality, municipio_id):
-        sql = 'SELECT "id" FROM "localities" WHERE "locality"=:locality AND "municipio_id"=:municipio_id'
-        params = {"locality": locality, "municipio_id": municipio_id}
-        self.execute_query(sql, params)
-        result = self.cursor.fetchone()
-        return result["id"] if result else None
+        return self.get_cached_id(
+            "localities", ("locality", "municipio_id"), (locality, municipio_id)
+        )
 
     # def __delete_data(self): Won't have a method for deleting data because it has no sense for this dimension table
     # def __update_data(self): Won't have a method for updating data because it has no sense for this dimension table
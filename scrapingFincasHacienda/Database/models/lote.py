@@ -8,7 +8,8 @@ import regex
 
 class Lote(Db.BaseDatabase):
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -29,18 +30,21 @@ class Lote(Db.BaseDatabase):
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_lote_id(auction_id, lote_number):
-            sql = """
-                    INSERT INTO "lotes" 
-                    ("auction_id","lote_number","price")
-                    VALUES (:auction_id, :lote_number, :price)
-                    """
-            params = {
-                "auction_id": auction_id,
-                "lote_number": lote_number,
-                "price": price,
-            }
-            self.execute_query(sql, params)
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_lote_id(auction_id, lote_number):
+            return row_id
+        sql = """
+                INSERT INTO "lotes" 
+                ("auction_id","lote_number","price")
+                VALUES (:auction_id, :lote_number, :price)
+                """
+        params = {
+            "auction_id": auction_id,
+            "lote_number": lote_number,
+            "price": price,
+        }
+        self.execute_query(sql, params)
+        return self.cursor.lastrowid
 
     def get_lote_id(self, auction_id, lote_number):
         sql = 'SELECT "id" FROM lotes WHERE auction_id=:auction_id AND lote_number=:lote_number'
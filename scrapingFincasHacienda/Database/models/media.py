@@ -0,0 +1,110 @@
+import hashlib
+import io
+from contextlib import nullcontext
+
+import Database.constants as const
+import Database.models.base_database as Db
+
+
+# Content-addressed store of the media files (ortofotos, maps, KMLs, reports, routes...).
+# Every file is stored once, identified by the SHA-256 of its content, on the 'media' database
+# (attached to the connection, see 'BaseDatabase.open_connection'). The rest of tables only
+# store the hash, so the main database stays small and the queries over it are fast.
+class Media(Db.BaseDatabase):
+    def __init__(self):
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
+
+    def __create_table(self):
+        sql = f"""
+            CREATE TABLE IF NOT EXISTS "{const.MEDIA_SCHEMA}"."files" (
+                "id" INTEGER,
+                "hash" TEXT NOT NULL UNIQUE,
+                "size" INTEGER NOT NULL,
+                "content" BLOB NOT NULL,
+                PRIMARY KEY ("id")
+            )
+            """
+        self.execute_query(sql)
+
+    # Stores the file (if its content isn't already stored) and returns its hash
+    def insert_file(self, path):
+        # If the argument is None, then do nothing
+        if not path:
+            return None
+        with open(path, "rb") as file:
+            return self.insert_stream(file)
+
+    # Same as 'insert_file', for contents that are already in memory
+    def insert_content(self, content):
+        # If the argument is None, then do nothing
+        if content is None:
+            return None
+        return self.insert_stream(io.BytesIO(content))
+
+    # Stores the content of a seekable file-like object (a file or a BLOB) and returns its hash.
+    # It's read on chunks (once to hash it and once to copy it), never loaded entirely in memory.
+    def insert_stream(self, source):
+        file_hash, size = Media.hash_stream(source)
+        if not self.get_media_id(file_hash):
+            source.seek(0)
+            media_id = self.__insert_data(file_hash, size)
+            self.write_blob("files", "content", media_id, source, const.MEDIA_SCHEMA)
+        return file_hash
+
+    def get_media_id(self, file_hash):
+        sql = f'SELECT "id" FROM "{const.MEDIA_SCHEMA}"."files" WHERE "hash"=:hash'
+        params = {"hash": file_hash}
+        self.execute_query(sql, params)
+        result = self.cursor.fetchone()
+        return result["id"] if result else None
+
+    # Returns the whole content of the file (or None if it isn't stored)
+    def get_content(self, file_hash):
+        with self.open_content(file_hash) as blob:
+            return blob.read() if blob is not None else None
+
+    # Returns a file-like object (read, seek, tell, len) to read the content lazily, without
+    # loading it in memory. Use it as a context manager:
+    #       with Media().open_content(finca["lidar"]) as blob:
+    #           chunk = blob.read(1024)
+    # Returns a null context (None) if the file isn't stored.
+    def open_content(self, file_hash):
+        media_id = self.get_media_id(file_hash) if file_hash else None
+        if not media_id:
+            return nullcontext()
+        return self.connection.blobopen(
+            "files", "content", media_id, readonly=True, name=const.MEDIA_SCHEMA
+        )
+
+    # Writes the content of the file on 'path' (i.e. to open it with another program)
+    def export_file(self, file_hash, path):
+        media_id = self.get_media_id(file_hash) if file_hash else None
+        if not media_id:
+            return None
+        return self.export_blob("files", "content", media_id, path, const.MEDIA_SCHEMA)
+
+    # Returns the SHA-256 and the size of the content
+    @staticmethod
+    def hash_stream(source):
+        sha256 = hashlib.sha256()
+        size = 0
+        while chunk := source.read(const.BLOB_CHUNK_SIZE):
+            sha256.update(chunk)
+            size += len(chunk)
+        return sha256.hexdigest(), size
+
+    # The content is written later (see 'BaseDatabase.write_blob')
+    def __insert_data(self, file_hash, size):
+        sql = f"""
+                INSERT INTO "{const.MEDIA_SCHEMA}"."files"
+                ("hash","size","content")
+                VALUES (:hash, :size, zeroblob(:content))
+                """
+        # "content" is the size of the empty BLOB that is reserved
+        params = {"hash": file_hash, "size": size, "content": size}
+        self.execute_query(sql, params)
+        return self.cursor.lastrowid
+
+    # def __delete_data(self): Won't have a method for deleting data because the same file
+    # may be referenced by several rows (of several tables)
@@ -8,7 +8,8 @@ import regex
 
 class Municipio(Db.BaseDatabase):
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -26,23 +27,24 @@ class Municipio(Db.BaseDatabase):
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_municipio_id(municipio):
-            sql = """
-                    INSERT INTO "municipios" 
-                    ("municipio")
-                    VALUES (:municipio)
-                """
-            params = {
-                "municipio": municipio,
-            }
-            self.execute_query(sql, params)
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_municipio_id(municipio):
+            return row_id
+        sql = """
+                INSERT INTO "municipios" 
+                ("municipio")
+                VALUES (:municipio)
+            """
+        params = {
+            "municipio": municipio,
+        }
+        self.execute_query(sql, params)
+        self.cache_id("municipios", (municipio,), self.cursor.lastrowid)
+        return self.cursor.lastrowid
 
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
     def get_municipio_id(self, municipio):
-        sql = """SELECT id FROM "municipios" WHERE "municipio"=:municipio"""
-        params = {"municipio": municipio}
-        self.execute_query(sql, params)
-        result = self.cursor.fetchone()
-        return result["id"] if result else None
+        return self.get_cached_id("municipios", ("municipio",), (municipio,))
 
     # def __delete_data(self): Won't have a method for deleting data because it has no sense for this dimension table
     # def __update_data(self): Won't have a method for updating data because it has no sense for this dimension table
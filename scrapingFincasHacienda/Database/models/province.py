@@ -8,7 +8,8 @@ import regex
 
 class Province(Db.BaseDatabase):
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -30,25 +31,26 @@ class Province(Db.BaseDatabase):
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_province_id(province):
-            sql = """
-                    INSERT INTO "provinces" 
-                    ("province","rusticas_transactions_now","rusticas_transactions_before")
-                    VALUES (:province, :rusticas_transactions_now, :rusticas_transactions_before)
-                """
-            params = {
-                "province": province,
-                "rusticas_transactions_now": rusticas_transactions_now,
-                "rusticas_transactions_before": rusticas_transactions_before,
-            }
-            self.execute_query(sql, params)
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_province_id(province):
+            return row_id
+        sql = """
+                INSERT INTO "provinces" 
+                ("province","rusticas_transactions_now","rusticas_transactions_before")
+                VALUES (:province, :rusticas_transactions_now, :rusticas_transactions_before)
+            """
+        params = {
+            "province": province,
+            "rusticas_transactions_now": rusticas_transactions_now,
+            "rusticas_transactions_before": rusticas_transactions_before,
+        }
+        self.execute_query(sql, params)
+        self.cache_id("provinces", (province,), self.cursor.lastrowid)
+        return self.cursor.lastrowid
 
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
     def get_province_id(self, province):
-        sql = """SELECT id FROM "provinces" WHERE "province"=:province"""
-        params = {"province": province}
-        self.execute_query(sql, params)
-        result = self.cursor.fetchone()
-        return result["id"] if result else None
+        return self.get_cached_id("provinces", ("province",), (province,))
 
     # def __delete_data(self): Won't have a method for deleting data because it has no sense for this dimension table
     # def __update_data(self): Won't have a method for updating data because it has no sense for this dimension table
@@ -8,7 +8,8 @@ import regex
 
 class Territorio(Db.BaseDatabase):  # ATH (agrupacion territorio homogeneo)
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -27,21 +28,22 @@ class Territorio(Db.BaseDatabase):  # ATH (agrupacion territorio homogeneo)
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_territorio_id(ath_number):
-            sql = """
-                    INSERT INTO "territorios" 
-                    ("ath_number","ath_name")
-                    VALUES (:ath_number, :ath_name)
-                    """
-            params = {"ath_number": ath_number, "ath_name": ath_name}
-            self.execute_query(sql, params)
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_territorio_id(ath_number):
+            return row_id
+        sql = """
+                INSERT INTO "territorios" 
+                ("ath_number","ath_name")
+                VALUES (:ath_number, :ath_name)
+                """
+        params = {"ath_number": ath_number, "ath_name": ath_name}
+        self.execute_query(sql, params)
+        self.cache_id("territorios", (ath_number,), self.cursor.lastrowid)
+        return self.cursor.lastrowid
 
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
     def get_territorio_id(self, ath_number):
-        sql = 'SELECT "id" FROM territorios WHERE "ath_number"=:ath_number'
-        params = {"ath_number": ath_number}
-        self.execute_query(sql, params)
-        result = self.cursor.fetchone()
-        return result["id"] if result else None
+        return self.get_cached_id("territorios", ("ath_number",), (ath_number,))
 
     # def __delete_data(self): Won't have a method for deleting data because it has no sense for this dimension table
     # def __update_data(self): Won't have a method for updating data because it has no sense for this dimension table
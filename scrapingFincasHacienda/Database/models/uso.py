@@ -8,8 +8,8 @@ import regex
 
 class Uso(Db.BaseDatabase):
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
-        self.__populate_table()  # If the table is already populated, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table, self.__populate_table)
 
     def __create_table(self):
         sql = f"""
@@ -37,12 +37,11 @@ class Uso(Db.BaseDatabase):
         sql = 'INSERT INTO "usos" ("uso_resumido", "uso_completo") VALUES (:resumido, :completo)'
         params = {"resumido": uso_resumido.lower(), "completo": uso_completo.lower()}
         self.execute_query(sql, params)
+        self.cache_id("usos", (uso_resumido.lower(),), self.cursor.lastrowid)
 
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
     def get_uso_id(self, uso_resumido):
-        sql = 'SELECT "id" FROM "usos" WHERE "uso_resumido"=:uso_resumido'
-        params = {"uso_resumido": uso_resumido.lower()}
-        self.execute_query(sql, params)
-        return self.cursor.fetchone()["id"]
+        return self.get_cached_id("usos", ("uso_resumido",), (uso_resumido.lower(),))
 
     # def __delete_data(self): Won't have a method for deleting data because
     # it's a dimension table that stores static data (CONSTANTS)
@@ -8,7 +8,8 @@ import regex
 
 class UsosSueloHilucs(Db.BaseDatabase):  # Descripcion Usos del Suelo s/Hilucs
     def __init__(self):
-        self.__create_table()  # If the table is already created, it does nothing
+        # Only the first time the class is instantiated on the process
+        self.create_table_once(self.__create_table)
 
     def __create_table(self):
         sql = f"""
@@ -26,21 +27,22 @@ class UsosSueloHilucs(Db.BaseDatabase):  # Descripcion Usos del Suelo s/Hilucs
             return None
         # Before inserting the data, check if already exists on the table
         # If it doesn't exists, then proceed to insert it
-        if not self.get_uso_suelo_id(uso_suelo):
-            sql = """
-                    INSERT INTO "usos_suelo_hilucs" 
-                    ("uso_suelo")
-                    VALUES (:uso_suelo)
-                    """
-            params = {"uso_suelo": uso_suelo}
-            self.execute_query(sql, params)
-
-    def get_uso_suelo_id(self, uso_suelo):
-        sql = 'SELECT "id" FROM "usos_suelo_hilucs" WHERE "uso_suelo"=:uso_suelo'
+        # Returns the id of the row (the existing one or the inserted one)
+        if row_id := self.get_uso_suelo_id(uso_suelo):
+            return row_id
+        sql = """
+                INSERT INTO "usos_suelo_hilucs" 
+                ("uso_suelo")
+                VALUES (:uso_suelo)
+                """
         params = {"uso_suelo": uso_suelo}
         self.execute_query(sql, params)
-        result = self.cursor.fetchone()
-        return result["id"] if result else None
+        self.cache_id("usos_suelo_hilucs", (uso_suelo,), self.cursor.lastrowid)
+        return self.cursor.lastrowid
+
+    # Answered from memory (see 'BaseDatabase.get_cached_id')
+    def get_uso_suelo_id(self, uso_suelo):
+        return self.get_cached_id("usos_suelo_hilucs", ("uso_suelo",), (uso_suelo,))
 
     # def __delete_data(self): Won't have a method for deleting data because it has no sense for this dimension table
     # def __update_data(self): Won't have a method for updating data because it has no sense for this dimension table
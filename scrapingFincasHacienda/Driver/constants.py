@@ -0,0 +1,25 @@
+from pathlib import Path
+
+# Maximum number of Chrome sessions alive at the same time
+POOL_SIZE = 4
+# Seconds that a scraper waits for a free session before giving up
+BORROW_TIMEOUT = 600
+# A session is recycled (quit and relaunched) after this number of uses,
+# so long runs don't accumulate the memory leaks of the browser
+MAX_USES_PER_SESSION = 50
+DEFAULT_IMPLICIT_WAIT = 15
+BLANK_PAGE = "about:blank"
+DEFAULT_DOWNLOAD_DIR = Path("../data").resolve()
+# Every borrowed session downloads into its own directory inside this one, so the scrapers
+# never confuse their files with the downloads of another session
+PRIVATE_DOWNLOADS_DIR = Path("../data/.downloads").resolve()
+DOWNLOAD_TIMEOUT = 60
+# Files that the browser is still writing
+PARTIAL_DOWNLOAD_SUFFIXES = (".crdownload", ".tmp", ".part")
+# Only used where inotify is not available (not Linux)
+DOWNLOAD_POLL_INTERVAL = 0.1
+# Map idle detection (used before taking screenshots of maps instead of fixed sleeps)
+# The map is idle when nothing changes during MAP_IDLE_QUIET_PERIOD seconds
+MAP_IDLE_QUIET_PERIOD = 0.5
+MAP_IDLE_POLL_INTERVAL = 0.1
+MAP_IDLE_MAX_WAIT = 10
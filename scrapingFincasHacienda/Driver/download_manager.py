@@ -0,0 +1,169 @@
+# Detection of finished downloads.
+# Chrome writes a download as '<name>.crdownload' and renames it to its final name when it's
+# complete, so instead of listing the download directory every few seconds, we ask the kernel
+# (inotify) to notify us when a file is renamed or closed after writing on the directory.
+# Since every session has its own directory, the first complete file is the one we expect.
+
+import ctypes
+import ctypes.util
+import os
+import select
+import shutil
+import struct
+import tempfile
+import time
+from pathlib import Path
+
+import Driver.constants as const
+
+# inotify flags (from <sys/inotify.h>)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+def load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1
+        return libc
+    except (OSError, AttributeError, TypeError):
+        return None
+
+
+libc = load_libc()
+
+
+# Private download directory of a session. It's removed when the session is released.
+def create_private_dir() -> Path:
+    const.PRIVATE_DOWNLOADS_DIR.mkdir(parents=True, exist_ok=True)
+    return Path(tempfile.mkdtemp(prefix="session_", dir=const.PRIVATE_DOWNLOADS_DIR))
+
+
+def remove_private_dir(directory) -> None:
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+# Moves the downloaded file to its final directory and name, and returns the new path
+def move_download(path, destination) -> str:
+    destination = Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    return str(shutil.move(str(path), str(destination)))
+
+
+# Chrome may create the file with its final name (empty) while it's still downloading the
+# '.crdownload', so the name isn't enough: the file must have content, and there can't be
+# any partial download left on the directory (it's private to the session).
+def is_complete(path: Path) -> bool:
+    if path.name.startswith(".") or path.name.endswith(const.PARTIAL_DOWNLOAD_SUFFIXES):
+        return False
+    try:
+        if path.stat().st_size == 0:
+            return False
+    except FileNotFoundError:
+        return False
+    return not any(
+        filename.endswith(const.PARTIAL_DOWNLOAD_SUFFIXES)
+        for filename in os.listdir(path.parent)
+    )
+
+
+class DownloadWatcher:
+    # It has to be created BEFORE the action that starts the download,
+    # otherwise a fast download could finish before we are watching the directory.
+    #   with DownloadWatcher(directory) as watcher:
+    #       button.click()
+    #       path = watcher.wait()
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.existing = set(os.listdir(self.directory))
+        self.fd = None
+        if libc is not None:
+            self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if self.fd < 0 or (
+                libc.inotify_add_watch(
+                    self.fd, str(self.directory).encode(), IN_CLOSE_WRITE | IN_MOVED_TO
+                )
+                < 0
+            ):
+                self.close()
+
+    def __repr__(self):
+        return f"DownloadWatcher('{self.directory}')"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        if self.fd is not None and self.fd >= 0:
+            os.close(self.fd)
+        self.fd = None
+
+    # Returns the path of the downloaded file as soon as it's complete
+    def wait(self, timeout: float = const.DOWNLOAD_TIMEOUT) -> Path:
+        if self.fd is None:
+            return self.__wait_polling(timeout)
+
+        deadline = time.monotonic() + timeout
+        while True:
+            # The file could be complete before the first event is read
+            if path := self.__find_new_file():
+                return path
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("No new file downloaded within timeout")
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if ready:
+                for filename in self.__read_events():
+                    if is_complete(self.directory / filename):
+                        return self.directory / filename
+
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+    ################################### PRIVATE METHODS ############################################
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+
+    def __read_events(self) -> list[str]:
+        try:
+            buffer = os.read(self.fd, 4096)
+        except BlockingIOError:
+            return []
+        filenames = []
+        offset = 0
+        while offset < len(buffer):
+            _, _, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            filenames.append(buffer[offset : offset + length].rstrip(b"\0").decode())
+            offset += length
+        return filenames
+
+    def __find_new_file(self):
+        for filename in set(os.listdir(self.directory)) - self.existing:
+            if is_complete(self.directory / filename):
+                return self.directory / filename
+        return None
+
+    def __wait_polling(self, timeout: float) -> Path:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if path := self.__find_new_file():
+                return path
+            time.sleep(const.DOWNLOAD_POLL_INTERVAL)
+        raise TimeoutError("No new file downloaded within timeout")
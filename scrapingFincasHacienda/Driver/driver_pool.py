@@ -0,0 +1,289 @@
+# Pool of warm Chrome sessions shared by all the scraper classes.
+# Launching Chrome is the biggest fixed cost of scraping a land, so instead of every
+# scraper starting (and quitting) its own browser, the scrapers borrow an already
+# configured session from the pool, and give it back when they finish. Before being
+# reused, the session is reset (windows, cookies, storage) and its health is checked.
+
+import atexit
+import logging
+import queue
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import Driver.constants as const
+from Driver.download_manager import (
+    DownloadWatcher,
+    create_private_dir,
+    move_download,
+    remove_private_dir,
+)
+from selenium import webdriver
+
+logger = logging.getLogger(__name__)
+
+
+class DriverPool:
+    _shared_borg_state = {}
+    _init_lock = threading.Lock()
+
+    # Implementing Borg Singleton (same as 'BaseDatabase')
+    # Every scraper shares the same sessions no matter where the pool is instantiated.
+    def __new__(cls, *args, **kwargs):
+        obj = super().__new__(cls)
+        obj.__dict__ = cls._shared_borg_state
+        return obj
+
+    def __init__(self, size: int = const.POOL_SIZE):
+        with DriverPool._init_lock:
+            # If the pool is already initialized, it does nothing
+            if "sessions" in self.__dict__:
+                return
+
+            # Validate the data types of our arguments
+            assert size > 0, f"Size {size} is not greater than zero!"
+
+            self.size = size
+            # LIFO, so the most recently used (warmest) session is handed out first
+            self.idle = queue.LifoQueue()
+            # Bounds the number of sessions borrowed at the same time
+            self.slots = threading.BoundedSemaphore(size)
+            self.lock = threading.Lock()
+            # Number of uses of every alive session (idle or borrowed)
+            self.sessions = {}
+
+            atexit.register(self.close_all)
+
+    def __repr__(self):
+        return f"DriverPool({self.size})"
+
+    def __str__(self):
+        return (
+            f"DriverPool Object:\n"
+            f"  Size: {self.size}\n"
+            f"  Alive sessions: {len(self.sessions)}\n"
+            f"  Idle sessions: {self.idle.qsize()}"
+        )
+
+    # Returns a healthy session configured for the caller.
+    # Blocks while all the sessions of the pool are borrowed.
+    def borrow(
+        self, download_dir=None, implicit_wait: int = const.DEFAULT_IMPLICIT_WAIT
+    ) -> webdriver.Chrome:
+        if not self.slots.acquire(timeout=const.BORROW_TIMEOUT):
+            raise TimeoutError("No browser session available within timeout")
+        try:
+            driver = self.__get_healthy_session()
+            self.__configure(driver, download_dir, implicit_wait)
+            return driver
+        except Exception:
+            self.slots.release()
+            raise
+
+    # Gives the session back to the pool. If it can't be reset, or it has been
+    # used too many times, it's quit and a new one will be launched when needed.
+    def release(self, driver: webdriver.Chrome) -> None:
+        try:
+            if (
+                self.sessions.get(driver, 0) >= const.MAX_USES_PER_SESSION
+                or not self.__reset(driver)
+            ):
+                self.__discard(driver)
+            else:
+                self.idle.put(driver)
+        finally:
+            self.slots.release()
+
+    # Launches sessions in advance, so the first scrapers don't pay the startup cost
+    def warm_up(self, n_sessions: int = 1) -> None:
+        n_sessions = min(n_sessions, self.size)
+        drivers = [self.borrow() for _ in range(n_sessions)]
+        for driver in drivers:
+            self.release(driver)
+
+    def close_all(self) -> None:
+        with self.lock:
+            drivers = list(self.sessions)
+            self.sessions.clear()
+        for driver in drivers:
+            DriverPool.__quit(driver)
+
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+    ################################### PRIVATE METHODS ############################################
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+
+    # Takes an idle session (discarding the broken ones), or launches a new one
+    def __get_healthy_session(self) -> webdriver.Chrome:
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                return self.__new_session()
+            if DriverPool.is_healthy(driver):
+                return driver
+            self.__discard(driver)
+
+    def __new_session(self) -> webdriver.Chrome:
+        options = webdriver.ChromeOptions()
+        options.add_experimental_option("detach", True)
+        options.add_argument("--disable-search-engine-choice-screen")
+        options.add_experimental_option("excludeSwitches", ["enable-logging"])
+        options.add_experimental_option(
+            "prefs",
+            {
+                "download.default_directory": str(const.DEFAULT_DOWNLOAD_DIR),
+                "download.prompt_for_download": False,  # To automatically save files to the specified directory without asking
+                "download.directory_upgrade": True,
+                "safebrowsing.enabled": True,
+                # Disable location permissions (because Google Maps took "My location"
+                # as the default for 'from' direction)
+                "profile.default_content_setting_values.geolocation": 2,
+            },
+        )
+        driver = webdriver.Chrome(options=options)
+        driver.maximize_window()
+        with self.lock:
+            self.sessions[driver] = 0
+
+        # Log
+        msg = f"New browser session launched ({len(self.sessions)}/{self.size} alive)."
+        logger.info(msg)
+
+        return driver
+
+    # Per-borrow configuration: implicit wait and the download directory of the caller
+    def __configure(self, driver, download_dir, implicit_wait) -> None:
+        driver.implicitly_wait(implicit_wait)
+        if download_dir:
+            driver.execute_cdp_cmd(
+                "Browser.setDownloadBehavior",
+                {"behavior": "allow", "downloadPath": str(download_dir)},
+            )
+        with self.lock:
+            self.sessions[driver] += 1
+
+    # Leaves the session as if it was just launched: one blank window without cookies
+    # nor storage (otherwise the cookie banners the scrapers close wouldn't show up)
+    # Returns Truthy value if the session is still usable
+    def __reset(self, driver) -> bool:
+        try:
+            origins = set()
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                origins.add(DriverPool.__get_origin(driver.current_url))
+                driver.close()
+            driver.switch_to.window(handles[0])
+            origins.add(DriverPool.__get_origin(driver.current_url))
+
+            for origin in origins - {None}:
+                driver.execute_cdp_cmd(
+                    "Storage.clearDataForOrigin",
+                    {"origin": origin, "storageTypes": "all"},
+                )
+            driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get(const.BLANK_PAGE)
+            return DriverPool.is_healthy(driver)
+        except Exception:
+
+            # Log
+            msg = "Failed to reset browser session, it will be discarded."
+            logger.warning(msg, exc_info=True)
+            return False
+
+    def __discard(self, driver) -> None:
+        with self.lock:
+            self.sessions.pop(driver, None)
+        DriverPool.__quit(driver)
+
+    # We use static methods when we want to do something that is not unique per instance,
+    # but it should do something that has a relationship with the class
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        try:
+            return driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def __quit(driver) -> None:
+        try:
+            driver.quit()
+        except Exception:
+            return None
+
+    @staticmethod
+    def __get_origin(url: str):
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            return None
+        return f"{parts.scheme}://{parts.netloc}"
+
+
+class PooledChrome:
+    # Base class of the scrapers (instead of inheriting from 'webdriver.Chrome').
+    # The session is borrowed from the pool the first time the scraper uses it, so the
+    # scrapers that return early (i.e. land is not 'Rústico') never take a browser.
+    # Every attribute that the scraper doesn't have (get, find_element, switch_to...)
+    # is delegated to the borrowed session.
+    # The browser downloads into a private directory of the session, and 'download_file'
+    # moves every file to 'download_dir' as soon as it's complete.
+
+    def __init__(
+        self, download_dir=None, implicit_wait: int = const.DEFAULT_IMPLICIT_WAIT
+    ):
+        self.download_dir = download_dir
+        self.implicit_wait = implicit_wait
+        self.driver = None
+        self.private_download_dir = None
+
+    # Only called when the attribute is not found on the scraper itself
+    def __getattr__(self, name):
+        if name.startswith("__") or "driver" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.borrow_driver(), name)
+
+    def borrow_driver(self) -> webdriver.Chrome:
+        if self.driver is None:
+            if self.download_dir:
+                self.private_download_dir = create_private_dir()
+            self.driver = DriverPool().borrow(
+                self.private_download_dir, self.implicit_wait
+            )
+        return self.driver
+
+    def release_driver(self) -> None:
+        if self.driver is not None:
+            DriverPool().release(self.driver)
+            self.driver = None
+        if self.private_download_dir is not None:
+            remove_private_dir(self.private_download_dir)
+            self.private_download_dir = None
+
+    # Runs the action that starts a download (i.e. clicking a button), and returns the
+    # path of the downloaded file, moved to 'download_dir' with the given filename
+    def download_file(
+        self, start_download, filename: str, timeout: float = const.DOWNLOAD_TIMEOUT
+    ) -> str:
+
+        # Validate the data types of our arguments
+        assert self.download_dir, "The scraper doesn't have a download directory!"
+        assert isinstance(filename, str), f"Filename {filename} must be a string!"
+
+        self.borrow_driver()
+        with DownloadWatcher(self.private_download_dir) as watcher:
+            start_download()
+            path = watcher.wait(timeout)
+        return move_download(path, Path(self.download_dir) / filename)
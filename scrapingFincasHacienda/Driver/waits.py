@@ -0,0 +1,101 @@
+# Condition based waits, used instead of fixed sleeps.
+# Before taking the screenshot of a map we have to wait until its tiles are rendered. Instead
+# of sleeping a fixed time (too much on most of the cases, too little on the slow ones), we
+# check from the browser that there aren't pending requests, and that the map stopped changing.
+
+import logging
+import time
+
+import Driver.constants as const
+
+logger = logging.getLogger(__name__)
+
+# It returns the state of the page:
+#   - pending: requests (fetch / XHR) in flight, and images not loaded yet
+#   - resources: number of resources (tiles...) already loaded. They're counted with a
+#     PerformanceObserver, because the resource timing buffer stops growing when it's full
+#     (250 entries by default, that Google Maps reaches soon).
+#   - canvas: signature of the canvas of the map (a small copy of its pixels, when the
+#     browser allows reading them, otherwise its size). The WebGL canvases (Google Maps) read
+#     as blank, so on those maps use a minimum wait too ('min_wait').
+# The first time, it wraps fetch and XHR to count the requests in flight.
+MAP_STATE_SCRIPT = """
+if (!window.__loadedResources) {
+    window.__loadedResources = {count: performance.getEntriesByType("resource").length};
+    const loaded = window.__loadedResources;
+    performance.setResourceTimingBufferSize(100000);
+    new PerformanceObserver((list) => {
+        loaded.count += list.getEntries().length;
+    }).observe({type: "resource"});
+}
+if (!window.__pendingRequests) {
+    window.__pendingRequests = {count: 0};
+    const pending = window.__pendingRequests;
+    const originalFetch = window.fetch;
+    if (originalFetch) {
+        window.fetch = function () {
+            pending.count++;
+            return originalFetch.apply(this, arguments).finally(() => pending.count--);
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        pending.count++;
+        this.addEventListener("loadend", () => pending.count--, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+}
+const images = Array.from(document.images).filter((image) => !image.complete).length;
+const canvases = Array.from(document.querySelectorAll("canvas")).map((canvas) => {
+    try {
+        const sample = document.createElement("canvas");
+        sample.width = 16;
+        sample.height = 16;
+        sample.getContext("2d").drawImage(canvas, 0, 0, 16, 16);
+        return sample.toDataURL();
+    } catch (error) {
+        return canvas.width + "x" + canvas.height;
+    }
+});
+return {
+    ready: document.readyState === "complete",
+    pending: Math.max(window.__pendingRequests.count, 0) + images,
+    resources: window.__loadedResources.count,
+    canvas: canvases.join("|"),
+};
+"""
+
+
+# Waits until the map of the page is rendered (no pending requests, and no changes for
+# 'quiet_period' seconds), at least 'min_wait' seconds but never more than 'max_wait' seconds.
+# Returns Truthy value if the map is idle, Falsy value if the max wait was reached.
+def wait_for_map_idle(
+    driver,
+    max_wait: float = const.MAP_IDLE_MAX_WAIT,
+    quiet_period: float = const.MAP_IDLE_QUIET_PERIOD,
+    poll_interval: float = const.MAP_IDLE_POLL_INTERVAL,
+    min_wait: float = 0,
+) -> bool:
+
+    # Validate the data types of our arguments
+    assert max_wait > 0, f"Max_wait {max_wait} is not greater than zero!"
+    assert quiet_period >= 0, f"Quiet_period {quiet_period} is negative!"
+    assert 0 <= min_wait <= max_wait, f"Min_wait {min_wait} must be in [0, {max_wait}]"
+
+    start = time.monotonic()
+    last_state = None
+    stable_since = start
+    while time.monotonic() - start < max_wait:
+        state = driver.execute_script(MAP_STATE_SCRIPT)
+        now = time.monotonic()
+        if state != last_state or state["pending"] or not state["ready"]:
+            last_state = state
+            stable_since = now
+        elif now - stable_since >= quiet_period and now - start >= min_wait:
+            return True
+        time.sleep(poll_interval)
+
+    # Log
+    msg = f"Map didn't stop loading within {max_wait} seconds, taking the screenshot anyway."
+    logger.warning(msg)
+    return False
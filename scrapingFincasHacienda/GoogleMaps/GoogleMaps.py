@@ -1,4 +1,4 @@
-# Class that inherits from a Selenium Class. It can be used in two ways
+# Class that borrows a Selenium session from the driver pool. It can be used in two ways
 # 1) Given two directions calculates the distance and time that takes from one point to the other
 # 2) Given a direction, we can take a screenshot of the place. We've to use the search_to method.
 
@@ -13,12 +13,13 @@
 
 import logging
 import sys
-import time
 
 import GoogleMaps.constants as const
 import logger_config
 import regex
-from selenium import webdriver
+from Driver.driver_pool import PooledChrome
+from Driver.waits import wait_for_map_idle
+from GoogleMaps.route_cache import RouteCache
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
@@ -33,7 +34,7 @@ def convert_path_to_str(path):
         return str(path)
 
 
-class GoogleMaps(webdriver.Chrome):
+class GoogleMaps(PooledChrome):
 
     # Class attribute to store all instances
     all = []
@@ -64,19 +65,7 @@ class GoogleMaps(webdriver.Chrome):
         ), f"Enterprise {enterprise} must be a string!"
         assert isinstance(debug, bool), f"Debug {debug} must be a boolean!"
 
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option("detach", True)
-        options.add_argument("--disable-search-engine-choice-screen")
-        options.add_experimental_option("excludeSwitches", ["enable-logging"])
-
-        # Disable location permissions (because Google Maps took "My location"
-        # as the default for 'from' direction)
-        options.add_experimental_option(
-            "prefs", {"profile.default_content_setting_values.geolocation": 2}
-        )
-        super().__init__(options=options)
-        self.maximize_window()
-        self.implicitly_wait(15)
+        super().__init__(implicit_wait=15)
         self.delegation = delegation
         self.lote = lote
         self.land = land
@@ -132,8 +121,7 @@ class GoogleMaps(webdriver.Chrome):
 
         finally:
             if self.debug == False:
-                self.quit()
-                time.sleep(1)
+                self.release_driver()
 
     # Given two directions ('to' and 'from'), it returns a dictionary with 2 keys.
     #   1) car (nested dictionary with two keys)
@@ -142,9 +130,23 @@ class GoogleMaps(webdriver.Chrome):
     #   2) foot (nested dictionary with two keys)
     #       2.1) time_on_foot
     #       2.2) distance_on_foot
+    # The routes already scraped (between the same points) are read from the route cache,
+    # without opening Google Maps (see 'route_cache.py').
 
     def get_data_two_directions(self) -> dict[str, dict[str, str]]:
         try:
+            route_cache = RouteCache()
+            data = route_cache.get(
+                self.to, self.from_, self.__screenshot_filename(self.enterprise)
+            )
+            if data is not None:
+                # Log
+                msg = f"Car and foot distance and time from '{self.ref}' - '{self.enterprise}' has been read from the route cache."
+                logger.info(
+                    f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}"
+                )
+                return data
+
             self.__land_first_page()
             self.__close_cookies()
             self.__search_to()
@@ -159,11 +161,13 @@ class GoogleMaps(webdriver.Chrome):
                 f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}"
             )
 
-            return {
+            data = {
                 "car": data_car,
                 "foot": data_foot,
                 "path": convert_path_to_str(filename),
             }
+            route_cache.put(self.to, self.from_, data)
+            return data
 
         except Exception:
 
@@ -176,8 +180,7 @@ class GoogleMaps(webdriver.Chrome):
 
         finally:
             if self.debug == False:
-                self.quit()
-                time.sleep(1)
+                self.release_driver()
 
     #
     #
@@ -240,17 +243,24 @@ class GoogleMaps(webdriver.Chrome):
             )
             zoom_out_button.click()
 
-        # Will only be True when called for the method get_data_two_directions
+        # Wait until the satellite tiles are rendered
+        wait_for_map_idle(
+            self,
+            quiet_period=const.MAP_IDLE_QUIET_PERIOD,
+            min_wait=const.MAP_IDLE_MIN_WAIT,
+        )
+
+        filename = self.__screenshot_filename(enterprise)
+        self.get_screenshot_as_file(filename)
+        return filename
+
+    # 'enterprise' will only be truthy when called for the method get_data_two_directions
+    def __screenshot_filename(self, enterprise=False):
         if enterprise:
             extra_path = f"-{self.enterprise[:15]}"
         else:
             extra_path = ""
-
-        time.sleep(10)
-
-        filename = const.DOWNLOAD_DIR / f"{self.ref}{extra_path}.png"
-        self.get_screenshot_as_file(filename)
-        return filename
+        return const.DOWNLOAD_DIR / f"{self.ref}{extra_path}.png"
 
     # Let the instance on Google Maps webpage that shows the route
     # (it must be done after searching 'to' destination)
@@ -5,3 +5,29 @@ import regex
 BASE_URL = "https://www.google.com/maps"
 DOWNLOAD_DIR = Path("../data/googlemaps").resolve()
 KM_PATTERN = regex.compile(r"\s.*")
+# The map of Google Maps is drawn with WebGL, and its pixels can't be read to know if it's
+# still changing (see 'Driver/waits.py'). So before the screenshot it waits at least
+# MAP_IDLE_MIN_WAIT seconds, and the map must be quiet for MAP_IDLE_QUIET_PERIOD seconds.
+MAP_IDLE_MIN_WAIT = 2
+MAP_IDLE_QUIET_PERIOD = 1.5
+# Coordinates as written on the Google Maps search box
+# DMS: 39°28'23.6"N 6°23'41.4"W
+DMS_PATTERN = regex.compile(
+    r"(\d+(?:\.\d+)?)°\s*(\d+(?:\.\d+)?)'\s*(\d+(?:\.\d+)?)\"?\s*([NSEW])"
+)
+# Decimal: 39.473222, -6.394833
+DECIMAL_PATTERN = regex.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+# Mean radius of the Earth
+EARTH_RADIUS_KM = 6371.0088
+# Only the enterprises closer to the land than ROUTES_RADIUS_KM (in a straight line), and of
+# them the ROUTES_TOP_K closest ones, are routed with Google Maps (see 'geo.py')
+ROUTES_RADIUS_KM = 50
+ROUTES_TOP_K = 10
+# Cache of the routes between two points (see 'route_cache.py').
+# Both points are snapped to a grid of ROUTE_CACHE_GRID_M meters, so the routes between
+# points closer than that are the same route.
+ROUTE_CACHE_NAME = "RouteCache.db"
+ROUTE_CACHE_GRID_M = 50
+ROUTE_CACHE_TTL = 180 * 24 * 60 * 60
+# Meters of a degree of latitude (and of longitude on the equator)
+METERS_PER_DEGREE = 111320
@@ -0,0 +1,77 @@
+# Straight-line (great-circle) distances between the land and the enterprises of Sa_-_bi.
+# Routing an enterprise with Google Maps costs a browser session and several seconds, so
+# before that the enterprises are ranked by their distance to the land (all of them at once,
+# with NumPy), and only the closest ones are routed (see 'full_get_data_two_directions').
+
+from typing import Union
+
+import GoogleMaps.constants as const
+import numpy as np
+import pandas as pd
+
+
+# Returns the enterprises (rows of 'data_sabi') closer to the coordinates than 'radius_km',
+# sorted from the closest, and at most 'top_k' of them (all of them if 'top_k' is None).
+# The distance is added on the column 'Distancia (km)'.
+# If the coordinates of the land can't be read, the enterprises are returned as they are.
+def rank_by_distance(
+    enterprises: pd.DataFrame,
+    coordinates: str,
+    radius_km: float = const.ROUTES_RADIUS_KM,
+    top_k: Union[int, None] = const.ROUTES_TOP_K,
+) -> pd.DataFrame:
+
+    # Validate the data types of our arguments
+    assert radius_km > 0, f"Radius_km {radius_km} is not greater than zero!"
+    assert top_k is None or top_k > 0, f"Top_k {top_k} is not greater than zero!"
+
+    # The caller logs it (once per land)
+    origin = parse_coordinates(coordinates)
+    if origin is None:
+        return enterprises
+
+    latitudes = pd.to_numeric(enterprises["Coordenada - Y"], errors="coerce")
+    longitudes = pd.to_numeric(enterprises["Coordenada - X"], errors="coerce")
+    distances = haversine_km(*origin, latitudes.to_numpy(), longitudes.to_numpy())
+
+    # Enterprises without coordinates have a NaN distance, so they are dropped too
+    order = np.argsort(distances, kind="stable")
+    order = order[distances[order] <= radius_km][:top_k]
+    ranked = enterprises.iloc[order].copy()
+    ranked["Distancia (km)"] = distances[order]
+    return ranked
+
+
+# Great-circle distance (km) from a point to every point of the arrays (haversine formula)
+def haversine_km(
+    latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray
+) -> np.ndarray:
+    latitude, longitude = np.radians(latitude), np.radians(longitude)
+    latitudes, longitudes = np.radians(latitudes), np.radians(longitudes)
+    a = (
+        np.sin((latitudes - latitude) / 2) ** 2
+        + np.cos(latitude)
+        * np.cos(latitudes)
+        * np.sin((longitudes - longitude) / 2) ** 2
+    )
+    return 2 * const.EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+# Given the coordinates as written on Google Maps (DMS or decimal), returns (latitude, longitude)
+# in decimal degrees, or None if they can't be read
+def parse_coordinates(coordinates: str) -> Union[tuple[float, float], None]:
+    if not coordinates:
+        return None
+
+    if match := const.DECIMAL_PATTERN.match(coordinates):
+        return float(match.group(1)), float(match.group(2))
+
+    values = {}
+    for degrees, minutes, seconds, hemisphere in const.DMS_PATTERN.findall(coordinates):
+        value = float(degrees) + float(minutes) / 60 + float(seconds) / 3600
+        if hemisphere in "SW":
+            value = -value
+        values["latitude" if hemisphere in "NS" else "longitude"] = value
+    if len(values) != 2:
+        return None
+    return values["latitude"], values["longitude"]
@@ -0,0 +1,140 @@
+# Cache of the routes between a land and an enterprise, so the same trip isn't scraped again
+# with Google Maps (i.e. the lands of a lote share the C.P., and so the enterprises of Sa_-_bi).
+# A route is identified by its two points snapped to a grid (see 'constants.ROUTE_CACHE_GRID_M'),
+# so the points of lands that are close together are the same point.
+# It stores the distance and time on car and on foot, and the screenshot of the route (its
+# bytes, so a hit doesn't depend on the land that scraped it being already on database, i.e.
+# the lands of a lote are scraped at the same time on batch mode). The downloaded screenshots
+# are deleted once they're inserted with the land, so on a hit it's written again.
+
+import atexit
+import logging
+import math
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Union
+
+import GoogleMaps.constants as const
+from GoogleMaps.geo import parse_coordinates
+
+logger = logging.getLogger(__name__)
+
+
+class RouteCache:
+    _shared_borg_state = {}
+    _init_lock = threading.Lock()
+
+    # Implementing Borg Singleton (same as 'DriverPool')
+    # Every route of every land shares the same cache.
+    def __new__(cls, *args, **kwargs):
+        obj = super().__new__(cls)
+        obj.__dict__ = cls._shared_borg_state
+        return obj
+
+    def __init__(self, path=const.ROUTE_CACHE_NAME):
+        with RouteCache._init_lock:
+            # If the cache is already opened, it does nothing
+            if "connection" in self.__dict__:
+                return
+
+            # The routes of all the lands use it from different threads
+            self.lock = threading.Lock()
+            self.connection = sqlite3.connect(path, check_same_thread=False)
+            sql = """
+                CREATE TABLE IF NOT EXISTS "routes" (
+                    "key" TEXT NOT NULL,
+                    "car" BLOB NOT NULL,
+                    "foot" BLOB NOT NULL,
+                    "screenshot" BLOB,
+                    "created" REAL NOT NULL,
+                    PRIMARY KEY ("key")
+                )
+                """
+            with self.connection:
+                # The routes cached before storing the screenshot (only its hash) are dropped
+                columns = {
+                    row[1]
+                    for row in self.connection.execute('PRAGMA table_info("routes")')
+                }
+                if columns and "screenshot" not in columns:
+                    self.connection.execute('DROP TABLE "routes"')
+                self.connection.execute(sql)
+                self.connection.execute(
+                    'DELETE FROM "routes" WHERE "created"<?',
+                    (time.time() - const.ROUTE_CACHE_TTL,),
+                )
+
+            atexit.register(self.close)
+
+    # Returns the route from 'from_' to 'to' as 'GoogleMaps.get_data_two_directions' does,
+    # with its screenshot written on 'screenshot_path'.
+    # Returns None if it isn't cached (or the points can't be read).
+    def get(self, to: str, from_: str, screenshot_path) -> Union[dict, None]:
+        key = RouteCache.build_key(to, from_)
+        if key is None:
+            return None
+
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT "car", "foot", "screenshot", "created" FROM "routes" WHERE "key"=?',
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+
+        car, foot, screenshot, created = row
+        if time.time() - created > const.ROUTE_CACHE_TTL:
+            return None
+
+        path = None
+        if screenshot is not None:
+            Path(screenshot_path).write_bytes(screenshot)
+            path = str(screenshot_path)
+
+        return {"car": pickle.loads(car), "foot": pickle.loads(foot), "path": path}
+
+    # Stores the route (the result of 'GoogleMaps.get_data_two_directions')
+    def put(self, to: str, from_: str, data: dict) -> None:
+        key = RouteCache.build_key(to, from_)
+        if key is None:
+            return None
+
+        screenshot = Path(data["path"]).read_bytes() if data["path"] else None
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO "routes" ("key", "car", "foot", "screenshot", "created") VALUES (?, ?, ?, ?, ?)',
+                (
+                    key,
+                    pickle.dumps(data["car"]),
+                    pickle.dumps(data["foot"]),
+                    screenshot,
+                    time.time(),
+                ),
+            )
+
+    def close(self) -> None:
+        with self.lock:
+            self.connection.close()
+
+    # Key of the route: both points snapped to the grid ('origin|destination').
+    # None if any of the points can't be read.
+    @staticmethod
+    def build_key(to: str, from_: str) -> Union[str, None]:
+        origin = parse_coordinates(from_)
+        destination = parse_coordinates(to)
+        if origin is None or destination is None:
+            return None
+        return f"{RouteCache.snap(*origin)}|{RouteCache.snap(*destination)}"
+
+    # Cell of the grid that contains the point (the meters of a degree of longitude get fewer
+    # towards the poles, so the cells have the same size in meters on every latitude)
+    @staticmethod
+    def snap(latitude: float, longitude: float) -> str:
+        cell = const.ROUTE_CACHE_GRID_M / const.METERS_PER_DEGREE
+        row = round(latitude / cell)
+        column = round(longitude * math.cos(math.radians(row * cell)) / cell)
+        return f"{row}:{column}"
@@ -1,11 +1,25 @@
+import os
 from pathlib import Path
 
 import regex
+from dotenv import dotenv_values
+
+# Load environment variables
+config = dotenv_values()
 
 ELECTRONIC_CSV_PATTERN = regex.compile(r"se\.bog\.adneicah.*:VSC", flags=regex.DOTALL)
 
 DOWNLOAD_DIR = Path("../data/auction").resolve()
 
+# Text extraction of the PDFs (see 'pdf_text.py').
+# "pypdfium2" is faster, but it's an optional dependency ('pip install pypdfium2')
+PDF_BACKENDS = ("pdfplumber", "pypdfium2")
+PDF_BACKEND = config.get("PDF_BACKEND", "pdfplumber")
+# The pages are split in ranges that are extracted on different processes
+PDF_WORKERS = os.cpu_count() or 1
+# PDFs with fewer pages than this are extracted on the same process (not worth it)
+PDF_MIN_PAGES_PER_TASK = 4
+
 # Number of delegations are 57 in total
 NUMBER_OF_DELEGATIONS = (
     57  # This number is for testing purposes, so it only run on a few provinces.
@@ -74,14 +88,28 @@ FIRST_PARAGRAPHS_PATTERN = regex.compile(
 PRICE_FIRST_STRUCTURE_PDF_PATTERN = regex.compile(r"(?<=\s)[\d\.,]+\s€")
 # This is the regular expression that is able to handle the pliego pdf that has the next structure (paragraphs)
 # Example: https://www.hacienda.gob.es/DGPatrimonio/Gesti%C3%B3n%20Patrimonial/subastas/DEH_TERUEL/Pliego%20de%20condiciones%20subasta.pdf
+MIN_LOTE_BODY_LENGTH = 30
+END_OF_LOTES_REGEX = r"^Segunda[:\.]\s"
 SECOND_PARAGRAPHS_PATTERN = regex.compile(
     (
         COMMON_REGEX
-        + r"(?:.|\n){30,}?"  # This is all that is in the middle of the paragraph
-        + rf"(?={COMMON_REGEX}|^Segunda[:\.]\s)"
+        + rf"(?:.|\n){{{MIN_LOTE_BODY_LENGTH},}}?"  # This is all that is in the middle of the paragraph
+        + rf"(?={COMMON_REGEX}|{END_OF_LOTES_REGEX})"
     ),
     flags=regex.MULTILINE | regex.IGNORECASE,
 )
+
+# Cheap patterns of the lote segmentation engine (see 'lote_segmentation.py'). They only find
+# the candidate positions, where the heavy patterns above are tried.
+LOTE_KEYWORD_PATTERN = regex.compile(
+    r"LOTE|BIEN|FINCA", flags=regex.MULTILINE | regex.IGNORECASE
+)
+END_OF_LOTES_PATTERN = regex.compile(
+    END_OF_LOTES_REGEX, flags=regex.MULTILINE | regex.IGNORECASE
+)
+REF_CATASTRAL_KEYWORD_PATTERN = regex.compile(r"Referen", flags=regex.IGNORECASE)
+FIRST_PARAGRAPHS_KEYWORDS = ("Rústica", "Urbana")
+
 ###### (On the second pdf structure). If have "garantia" on the paragraph:
 PRICE_SECOND_STRUCTURE_PDF_WITH_GARANTIA_PATTERN = regex.compile(
     (
@@ -1,20 +1,25 @@
 # Contains several functions, that are all used when calling the function get_pliego_info. Given the PDF that contains the list of lands in auction, it extracts
 # the ref_catastral and the price
 
-import io
 import logging
-from typing import Union
+import threading
+from typing import Iterator, Union
 
 import Hacienda.constants as const
 import logger_config
-import pdfplumber
 import regex
 import requests
 from bs4 import BeautifulSoup
+from Hacienda.lote_segmentation import find_refs, segment_lotes
+from Hacienda.pdf_text import count_pages, extract_pages_text, shutdown_executor
 
 # Logger configuration
 logger = logging.getLogger(__name__)
 
+# Cache of the PDFs read during the run. Keys are the urls, values are 'CachedPdf' objects.
+_pdf_cache = {}
+_pdf_cache_lock = threading.Lock()
+
 
 def get_auction_id(url_pdf, delegation, auction):
     try:
@@ -130,20 +135,141 @@ def read_pdf(url_pdf: str, only_first_page=False) -> str:
     # Validate the data types of our arguments
     assert isinstance(url_pdf, str), f"Url_pdf {url_pdf} must be a string!"
 
-    response = requests.get(url_pdf)
-    pdf_binary = response.content
-    pdf_content = io.BytesIO(pdf_binary)
-    with pdfplumber.open(pdf_content) as pdf:
-        # Extract content from all the pages, to parse lotes...
-        if not only_first_page:
-            text_pages = [page.extract_text() for page in pdf.pages]
-            text = " ".join(text_pages)
-        # Extract only the first page (to get the electronic csv)
-        else:
-            text = pdf.pages[0].extract_text()
+    pdf = get_cached_pdf(url_pdf)
+    # Extract content from all the pages, to parse lotes...
+    if not only_first_page:
+        text = pdf.get_text()
+    # Extract only the first page (to get the electronic csv)
+    else:
+        text = pdf.get_page_text(0)
     return text
 
 
+# Given a url of a PDF, it yields the text of its pages one by one.
+# Each page is only extracted when it's reached, so if the caller stops iterating
+# (i.e. it already found what it was looking for) the rest of the pages are never extracted.
+def iter_pdf_pages(url_pdf: str) -> Iterator[str]:
+
+    # Validate the data types of our arguments
+    assert isinstance(url_pdf, str), f"Url_pdf {url_pdf} must be a string!"
+
+    pdf = get_cached_pdf(url_pdf)
+    for page_number in range(pdf.get_page_count()):
+        yield pdf.get_page_text(page_number)
+
+
+# Given a url of a PDF, it returns the first match of the search (a function that given a text
+# and the position where the matches can start returns a match or None, i.e. 'search_ref') page
+# by page, so it stops on the first page that matches. Returns None if no page matches.
+# Each page is searched after the end of the previous one, joined as 'get_text' does, so a match
+# split between two pages (i.e. the label at the bottom of a page and the ref at the top of the
+# next one) is still found:
+#   o The matches start on a line with the keyword (i.e. 'Referen'), and they don't reach the next
+#     line with the keyword. So only the last line with the keyword (or the last line, joined with
+#     the next page) can start a match that goes on in the next page.
+#   o The lookbehinds look back to the previous line, so it's kept before as context (the matches
+#     can't start on it).
+def search_pdf(
+    url_pdf: str, search, keyword: regex.Pattern
+) -> Union[regex.Match, None]:
+    previous_end = ""
+    position = 0
+    for page in iter_pdf_pages(url_pdf):
+        text = f"{previous_end} {page}" if previous_end else page
+        if match := search(text, position):
+            return match
+
+        lines = text.split("\n")
+        line_starts = [0]
+        for line in lines[:-1]:
+            line_starts.append(line_starts[-1] + len(line) + 1)
+
+        next_line = len(lines) - 1
+        for number, line in enumerate(lines[:-1]):
+            if line_starts[number] >= position and keyword.search(line):
+                next_line = number
+        context_line = max(next_line - 1, 0)
+        previous_end = "\n".join(lines[context_line:])
+        position = line_starts[next_line] - line_starts[context_line]
+    return None
+
+
+# Given a url of a PDF, it returns its entry on the cache of the run (created if it's the first time)
+def get_cached_pdf(url_pdf: str) -> "CachedPdf":
+
+    # Validate the data types of our arguments
+    assert isinstance(url_pdf, str), f"Url_pdf {url_pdf} must be a string!"
+
+    with _pdf_cache_lock:
+        if url_pdf not in _pdf_cache:
+            _pdf_cache[url_pdf] = CachedPdf(url_pdf)
+        return _pdf_cache[url_pdf]
+
+
+# Frees the memory used by the PDFs of the run (and the processes that extract their text)
+def clear_pdf_cache() -> None:
+    with _pdf_cache_lock:
+        _pdf_cache.clear()
+    shutdown_executor()
+
+
+# The same pliego is used by 'has_ref_catastral', 'get_csv', 'get_lotes_data' and 'download_url_pliego_pdf'.
+# So for each url, the PDF is downloaded only once, and the text of each page is extracted only once.
+class CachedPdf:
+    def __init__(self, url_pdf: str):
+
+        # Validate the data types of our arguments
+        assert isinstance(url_pdf, str), f"Url_pdf {url_pdf} must be a string!"
+
+        self.url_pdf = url_pdf
+        self.content = None  # Raw bytes of the PDF
+        self.pages = None  # Text of each page (None until the page is extracted)
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f"CachedPdf('{self.url_pdf}')"
+
+    # Returns the raw bytes of the PDF
+    def get_content(self) -> bytes:
+        with self.lock:
+            if self.content is None:
+                response = requests.get(self.url_pdf)
+                response.raise_for_status()
+                self.content = response.content
+            return self.content
+
+    def get_page_count(self) -> int:
+        content = self.get_content()
+        with self.lock:
+            if self.pages is None:
+                self.pages = [None] * count_pages(content)
+            return len(self.pages)
+
+    # Returns the text of a page (the first page is the number 0)
+    def get_page_text(self, page_number: int) -> str:
+        self.__extract_pages([page_number])
+        return self.pages[page_number]
+
+    # Returns the text of all the pages in one string
+    def get_text(self) -> str:
+        self.__extract_pages()
+        return " ".join(self.pages)
+
+    # Extract the text of the pages (all of them if not specified) that are not extracted yet.
+    # The pages are extracted in parallel (see 'pdf_text.py').
+    def __extract_pages(self, page_numbers=None) -> None:
+        self.get_page_count()
+        content = self.get_content()
+        with self.lock:
+            if page_numbers is None:
+                page_numbers = range(len(self.pages))
+            pending = [number for number in page_numbers if self.pages[number] is None]
+            if not pending:
+                return None
+            for number, text in extract_pages_text(content, pending).items():
+                self.pages[number] = text
+
+
 # Given a text, it returns a dictionary with two keys.
 #   1) Type of structure
 #   2) List:
@@ -153,16 +279,8 @@ def get_lotes(text: str) -> dict[str, Union[str, list[str]]]:
     # Validate the data types of our arguments
     assert isinstance(text, str), f"Text {text} must be a string!"
 
-    if regex.search(const.CHECKER_SECOND_STRUCTURE_PATTERN, text):
-        structure = "paragraphs"
-        lotes = regex.findall(const.SECOND_PARAGRAPHS_PATTERN, text)
-    else:
-        structure = "tables"
-        lotes = regex.findall(const.FIRST_PARAGRAPHS_PATTERN, text)
-    return {
-        "structure": structure,
-        "text": lotes,
-    }
+    # The heavy patterns are only tried on the candidate lines (see 'lote_segmentation.py')
+    return segment_lotes(text)
 
 
 # Given the structure of the lote text, and the lote itself
@@ -192,7 +310,7 @@ def get_ref_catastral(lote: str) -> list[str]:
     # Validate the data types of our arguments
     assert isinstance(lote, str), f"Lote {lote} must be a string!"
 
-    ref_catastrales = regex.findall(const.REF_CATASTRAL_PATTERN, lote)
+    ref_catastrales = find_refs(lote)
     if len(ref_catastrales) >= 1:
         return ref_catastrales
     else:
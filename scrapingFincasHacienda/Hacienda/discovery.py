@@ -0,0 +1,94 @@
+# Concurrent discovery stage. For a delegation it searches the auction, the PDF that contains the
+# list of lands, the auction id and the lotes. All of them are blocking requests, so the delegations
+# are fanned out to a bounded pool of threads. This way the daily sweep takes about as long as the
+# slowest delegation, instead of the sum of all of them.
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+import Hacienda.constants as const
+import logger_config
+from Database.helpers import is_auction_id_old, run_in_db_thread
+from Hacienda.auction_delegation import has_auction
+from Hacienda.data_pdf import get_auction_id, get_lotes_data
+from Hacienda.pliego_url import download_url_pliego_pdf, get_pliego
+
+# Logger configuration
+logger = logging.getLogger(__name__)
+
+
+# Returns a list of dictionaries (one for each delegation with an auction), in the same
+# order as the delegations. Each dictionary represents an auction with the next keys:
+#   1) delegation
+#   2) auction (url of the auction)
+#   3) auction_pdf_url (url of the pdf that contains the list of lands)
+#   4) id_auction
+#   5) auction_pdf_path (downloaded pdf)
+#   6) lotes (same structure that returns 'get_lotes_data')
+# The auctions already stored on database aren't downloaded.
+# The number of threads is 'N_DISCOVERY_WORKERS' (see 'main.py').
+def discover_auctions(delegations, max_workers: int) -> list[dict]:
+
+    # Validate the data types of our arguments
+    assert max_workers > 0, f"Max_workers {max_workers} is not greater than zero!"
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="discovery"
+    ) as executor:
+        auctions = list(executor.map(discover_delegation, delegations))
+
+    return [auction for auction in auctions if auction]
+
+
+# Runs the discovery steps for one delegation. Returns None if any of them fails.
+def discover_delegation(delegation: int) -> Union[dict, None]:
+
+    # Validate the data types of our arguments
+    assert delegation > 0, f"Delegation {delegation} is not greater than zero!"
+
+    try:
+        # 1) Search on hacienda website if there's any auction.
+        if not (auction := has_auction(delegation)):
+            return None
+
+        # 2) Get the pdf that contains the list of lands. Returns url_pliego
+        if not (auction_pdf_url := get_pliego(auction, delegation)):
+            return None
+
+        # 3) Get/build the auction unique identifier
+        if not (id_auction := get_auction_id(auction_pdf_url, delegation, auction)):
+            return None
+
+        # Check if id_auction is on db, if so its pdf isn't downloaded nor read
+        if run_in_db_thread(is_auction_id_old, delegation, id_auction):
+            return None
+
+        # 4) Download pdf from auction_pdf_url
+        if not (
+            auction_pdf_path := download_url_pliego_pdf(
+                auction_pdf_url, delegation, auction
+            )
+        ):
+            return None
+
+        # 5) Extract ref_catastral and price of every lote.
+        if not (lotes := get_lotes_data(auction_pdf_url, delegation)):
+            return None
+
+        return {
+            "delegation": delegation,
+            "auction": auction,
+            "auction_pdf_url": auction_pdf_url,
+            "id_auction": id_auction,
+            "auction_pdf_path": auction_pdf_path,
+            "lotes": lotes,
+        }
+
+    except Exception:
+
+        # Log
+        msg = "Failed to discover the auction of the delegation."
+        logger.error(f"{logger_config.build_id(delegation)}{msg}", exc_info=True)
+
+        return None
@@ -0,0 +1,158 @@
+# Segmentation of the text of the pliego in lotes, and of the referencias catastrales of a lote.
+# The patterns of 'constants.py' ('COMMON_REGEX', 'REF_CATASTRAL_PATTERN') have lookbehinds of
+# variable length that look back to the previous line, so searching them over the whole text
+# evaluates those lookbehinds on every position of the text.
+# Instead, the text is split in lines once, and the cheap patterns (a keyword, the start of a line)
+# find the candidate positions. The heavy patterns are only tried on those positions, matching
+# on the whole text, so their lookbehinds see the same context and the results are the same ones
+# that 'regex.findall' returns (see 'Testing/benchmark_lote_segmentation.py').
+
+from bisect import bisect_left
+from functools import cached_property
+from typing import Union
+
+import Hacienda.constants as const
+import regex
+
+
+# Given a text, it returns a dictionary with two keys (see 'data_pdf.get_lotes').
+#   1) Type of structure
+#   2) List:
+#       o Each element represents all the text of a lote
+def segment_lotes(text: str) -> dict[str, Union[str, list[str]]]:
+
+    # Validate the data types of our arguments
+    assert isinstance(text, str), f"Text {text} must be a string!"
+
+    segmented = SegmentedText(text)
+    if segmented.lote_starts:
+        structure = "paragraphs"
+        lotes = segmented.get_paragraphs()
+    else:
+        structure = "tables"
+        lotes = segmented.get_tables()
+    return {
+        "structure": structure,
+        "text": lotes,
+    }
+
+
+# Given a text, it returns the referencias catastrales on it (the same as
+# 'regex.findall(const.REF_CATASTRAL_PATTERN, text)')
+def find_refs(text: str) -> list[str]:
+
+    # Validate the data types of our arguments
+    assert isinstance(text, str), f"Text {text} must be a string!"
+
+    return [match.group(1) for match in SegmentedText(text).iter_refs()]
+
+
+# Given a text, it returns the first match of 'const.REF_CATASTRAL_PATTERN' that starts from the
+# position 'pos' (the text before it is only the context of the lookbehinds), or None
+def search_ref(text: str, pos: int = 0) -> Union[regex.Match, None]:
+
+    # Validate the data types of our arguments
+    assert isinstance(text, str), f"Text {text} must be a string!"
+    assert isinstance(pos, int), f"Position {pos} must be an integer!"
+
+    return next(SegmentedText(text).iter_refs(pos), None)
+
+
+class SegmentedText:
+    def __init__(self, text: str):
+        self.text = text
+        self.lines = text.split("\n")
+        # Position of the first character of each line on the text
+        self.line_starts = [0]
+        for line in self.lines[:-1]:
+            self.line_starts.append(self.line_starts[-1] + len(line) + 1)
+
+    def __repr__(self):
+        return f"SegmentedText({len(self.lines)} lines)"
+
+    # (start, end) of every match of 'COMMON_REGEX' (the beginning of a lote).
+    # It's only tried where there's a 'LOTE', 'BIEN' or 'FINCA' keyword.
+    @cached_property
+    def lote_starts(self) -> list[tuple[int, int]]:
+        starts = []
+        for keyword in const.LOTE_KEYWORD_PATTERN.finditer(self.text):
+            match = const.CHECKER_SECOND_STRUCTURE_PATTERN.match(
+                self.text, keyword.start()
+            )
+            if match:
+                starts.append(match.span())
+        return starts
+
+    # Same as 'regex.findall(const.SECOND_PARAGRAPHS_PATTERN, text)'.
+    # A lote goes from its beginning to the next beginning of a lote (or 'Segunda:'), at least
+    # 'MIN_LOTE_BODY_LENGTH' characters after the end of its keyword.
+    def get_paragraphs(self) -> list[str]:
+        end_of_lotes = self.__iter_line_starts(
+            lambda line, start: const.END_OF_LOTES_PATTERN.match(self.text, start)
+        )
+        ends = sorted({start for start, _ in self.lote_starts}.union(end_of_lotes))
+
+        paragraphs = []
+        position = 0
+        for start, end in self.lote_starts:
+            if start < position:
+                continue
+            index = bisect_left(ends, end + const.MIN_LOTE_BODY_LENGTH)
+            if index == len(ends):
+                continue
+            paragraphs.append(self.text[start : ends[index]])
+            position = ends[index]
+        return paragraphs
+
+    # Same as 'regex.findall(const.FIRST_PARAGRAPHS_PATTERN, text)'
+    def get_tables(self) -> list[str]:
+        return [
+            match.group()
+            for match in self.__iter_matches(
+                const.FIRST_PARAGRAPHS_PATTERN,
+                lambda line, start: line.startswith(const.FIRST_PARAGRAPHS_KEYWORDS),
+            )
+        ]
+
+    # Same as 'regex.finditer(const.REF_CATASTRAL_PATTERN, text, pos=pos)'
+    def iter_refs(self, pos: int = 0):
+        return self.__iter_matches(
+            const.REF_CATASTRAL_PATTERN,
+            lambda line, start: const.REF_CATASTRAL_KEYWORD_PATTERN.search(line),
+            pos,
+        )
+
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+    ################################### PRIVATE METHODS ############################################
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+
+    # Positions of the lines that pass the check ('is_candidate(line, start)')
+    def __iter_line_starts(self, is_candidate):
+        for line, start in zip(self.lines, self.line_starts):
+            if is_candidate(line, start):
+                yield start
+
+    # Matches of a pattern anchored at the start of the line ('^'), tried only on the candidate
+    # lines from 'pos'. As 'regex.finditer', the next match is searched after the end of the
+    # previous one.
+    def __iter_matches(self, pattern, is_candidate, pos: int = 0):
+        position = pos
+        for start in self.__iter_line_starts(is_candidate):
+            if start < position:
+                continue
+            match = pattern.match(self.text, start)
+            if match:
+                yield match
+                position = match.end()
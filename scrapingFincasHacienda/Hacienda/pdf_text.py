@@ -0,0 +1,147 @@
+# Text extraction of the PDFs (pliegos and anexos).
+# Extracting the text is CPU-bound (pdfplumber is pure Python), so the pages of a PDF are split
+# in ranges that are extracted at the same time on a pool of processes (one per core), and then
+# put back together in order.
+# The library that extracts the text is chosen with PDF_BACKEND (see 'constants.py'):
+#   - "pdfplumber" (by default)
+#   - "pypdfium2" (faster, optional dependency). If it isn't installed, pdfplumber is used.
+
+import importlib.util
+import io
+import logging
+import math
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import Hacienda.constants as const
+import pdfplumber
+
+# Logger configuration
+logger = logging.getLogger(__name__)
+
+# Pool of processes, created the first time a PDF big enough is extracted
+_executor = None
+_executor_lock = threading.Lock()
+# The fallback of the optional backend is only logged once
+_backend_warning = threading.Event()
+
+
+# Returns the text of the pages (the first page is the number 0) as {page_number: text}
+def extract_pages_text(
+    content: bytes, page_numbers: list[int], backend: str = const.PDF_BACKEND
+) -> dict[int, str]:
+
+    # Validate the data types of our arguments
+    assert isinstance(content, bytes), "Content must be bytes!"
+    assert (
+        backend in const.PDF_BACKENDS
+    ), f"Backend {backend} must be in {const.PDF_BACKENDS}"
+
+    backend = get_available_backend(backend)
+    page_numbers = list(page_numbers)
+    ranges = split_in_ranges(page_numbers)
+
+    if len(ranges) <= 1:
+        texts = extract_range(content, page_numbers, backend)
+    else:
+        try:
+            texts = []
+            for range_texts in get_executor().map(
+                extract_range, repeat(content), ranges, repeat(backend)
+            ):
+                texts.extend(range_texts)
+        except Exception:
+
+            # Log
+            msg = f"Failed to extract the text of the PDF on the pool of processes, it'll be extracted on this process."
+            logger.warning(msg, exc_info=True)
+            texts = extract_range(content, page_numbers, backend)
+
+    return dict(zip(page_numbers, texts))
+
+
+# Number of pages of the PDF
+def count_pages(content: bytes, backend: str = const.PDF_BACKEND) -> int:
+    if get_available_backend(backend) == "pypdfium2":
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(content)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        return len(pdf.pages)
+
+
+# Runs on the processes of the pool: returns the text of the pages, in the same order
+def extract_range(content: bytes, page_numbers: list[int], backend: str) -> list[str]:
+    if backend == "pypdfium2":
+        import pypdfium2
+
+        pdf = pypdfium2.PdfDocument(content)
+        try:
+            texts = []
+            for number in page_numbers:
+                page = pdf[number]
+                text_page = page.get_textpage()
+                # pdfium separates the lines with '\r\n', pdfplumber with '\n'
+                texts.append(text_page.get_text_range().replace("\r\n", "\n"))
+                text_page.close()
+                page.close()
+            return texts
+        finally:
+            pdf.close()
+
+    with pdfplumber.open(io.BytesIO(content)) as pdf:
+        return [pdf.pages[number].extract_text() for number in page_numbers]
+
+
+# Splits the pages in (at most) one range per process, of at least PDF_MIN_PAGES_PER_TASK pages
+def split_in_ranges(page_numbers: list[int]) -> list[list[int]]:
+    n_ranges = max(
+        1, min(const.PDF_WORKERS, len(page_numbers) // const.PDF_MIN_PAGES_PER_TASK)
+    )
+    size = math.ceil(len(page_numbers) / n_ranges) or 1
+    return [
+        page_numbers[start : start + size]
+        for start in range(0, len(page_numbers), size)
+    ]
+
+
+# The optional backend falls back to pdfplumber if it isn't installed
+def get_available_backend(backend: str) -> str:
+    if backend == "pypdfium2" and importlib.util.find_spec("pypdfium2") is None:
+        if not _backend_warning.is_set():
+            _backend_warning.set()
+
+            # Log
+            msg = "PDF_BACKEND is 'pypdfium2' but it isn't installed, so 'pdfplumber' is used instead."
+            logger.warning(msg)
+        return "pdfplumber"
+    return backend
+
+
+# The processes are started with 'spawn' (not forked), because the process that starts them
+# has other threads running (database thread, drivers...)
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=const.PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+# Stops the processes of the pool (they're started again if needed)
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown()
+            _executor = None
@@ -5,10 +5,10 @@ from datetime import date
 
 import Hacienda.constants as const
 import logger_config
-import regex
 import requests
 from bs4 import BeautifulSoup
-from Hacienda.data_pdf import read_pdf
+from Hacienda.data_pdf import get_cached_pdf, search_pdf
+from Hacienda.lote_segmentation import search_ref
 
 # Logger configuration
 logger = logging.getLogger(__name__)
@@ -55,9 +55,9 @@ def has_ref_catastral(url_pdf: str):
     assert isinstance(url_pdf, str), f"Url_pdf {url_pdf} must be a string!"
 
     # Sometimes the Pliego PDF doesn't contain the list of properties, but just the announcement,
-    # and so the list of properties is detailed on another anchor tag
-    text_pdf = read_pdf(url_pdf)
-    return regex.search(const.REF_CATASTRAL_PATTERN, text_pdf)
+    # and so the list of properties is detailed on another anchor tag.
+    # It stops on the first page with a ref, the rest of the PDF isn't extracted here.
+    return search_pdf(url_pdf, search_ref, const.REF_CATASTRAL_KEYWORD_PATTERN)
 
 
 def download_url_pliego_pdf(url_pdf: str, delegation: int, auction: int) -> str:
@@ -67,11 +67,12 @@ def download_url_pliego_pdf(url_pdf: str, delegation: int, auction: int) -> str:
     filename = const.DOWNLOAD_DIR / f"{today}_Delegation_{delegation}.pdf"
 
     try:
-        response = requests.get(url_pdf)
+        # Same bytes that were already downloaded to parse the PDF
+        content = get_cached_pdf(url_pdf).get_content()
 
         # Write the content to a file
         with open(filename, "wb") as file:
-            file.write(response.content)
+            file.write(content)
 
         # Log
         msg = f"Successfully downloaded url_pliego_pdf {url_pdf}.\n Saved on {filename}"
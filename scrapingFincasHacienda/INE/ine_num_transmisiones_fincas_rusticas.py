@@ -2,19 +2,19 @@
 # The INE only provides this data for rural lands
 
 import logging
-import time
 from typing import Union
 
 import INE.constants as const
 import logger_config
-from selenium import webdriver
+from Cache.scrape_cache import cached_scrape
+from Driver.driver_pool import PooledChrome
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import Select
 
 logger = logging.getLogger(__name__)
 
 
-class IneNumTransmisionesFincasRusticas(webdriver.Chrome):
+class IneNumTransmisionesFincasRusticas(PooledChrome):
 
     # Class attribute to store all instances
     all = []
@@ -39,13 +39,7 @@ class IneNumTransmisionesFincasRusticas(webdriver.Chrome):
         assert isinstance(clase, str), f"Clase {clase} must be a string!"
         assert isinstance(debug, bool), f"Debug {debug} must be a boolean!"
 
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option("detach", True)
-        options.add_argument("--disable-search-engine-choice-screen")
-        options.add_experimental_option("excludeSwitches", ["enable-logging"])
-        super().__init__(options=options)
-        self.maximize_window()
-        self.implicitly_wait(15)
+        super().__init__(implicit_wait=15)
         self.delegation = delegation
         self.lote = lote
         self.land = land
@@ -95,20 +89,7 @@ class IneNumTransmisionesFincasRusticas(webdriver.Chrome):
                 return const.EMPTY_DICTIONARY_FINCAS
 
             # If is 'Rústico' proceed with the class.
-            self.__land_first_page()
-            self.__close_cookies()
-            self.__choose_province()
-            self.__choose_transaction_type()
-            self.__choose_past_year()
-            self.__see_results()
-            data = self.__get_results()
-
-            # Log
-            msg = f"Number of transactions of 'Fincas Rusticas' where land '{self.ref}' is located: Now -> {data['transactions_now']} /// Seven years ago -> {data['transactions_before']}"
-            logger.info(
-                f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}"
-            )
-            return data
+            return self.__scrape_province()
 
         except Exception:
 
@@ -122,8 +103,7 @@ class IneNumTransmisionesFincasRusticas(webdriver.Chrome):
 
         finally:
             if self.debug == False:
-                self.quit()
-                time.sleep(1)
+                self.release_driver()
 
     #
     #
@@ -141,6 +121,30 @@ class IneNumTransmisionesFincasRusticas(webdriver.Chrome):
     #
     #
 
+    # The result is cached per province, the first 2 digits of the C.P. as on
+    # 'is_ine_transmisiones_rust_in_db' (see 'Cache/scrape_cache.py'). It's only used for
+    # 'Rústico' lands, so the lands of other clase never read the figures of their province.
+    @cached_scrape(
+        "ine_transmisiones",
+        key=lambda self: (self.cp[:2],),
+        is_valid=lambda data: data != const.EMPTY_DICTIONARY_FINCAS,
+    )
+    def __scrape_province(self) -> dict[str, Union[int, float]]:
+        self.__land_first_page()
+        self.__close_cookies()
+        self.__choose_province()
+        self.__choose_transaction_type()
+        self.__choose_past_year()
+        self.__see_results()
+        data = self.__get_results()
+
+        # Log
+        msg = f"Number of transactions of 'Fincas Rusticas' where land '{self.ref}' is located: Now -> {data['transactions_now']} /// Seven years ago -> {data['transactions_before']}"
+        logger.info(
+            f"{logger_config.build_id(self.delegation, self.lote, self.land)}{msg}"
+        )
+        return data
+
     # Lands on an Ine webpage
     def __land_first_page(self) -> None:
         self.get(const.BASE_URL_INE)
@@ -1,6 +1,5 @@
-# Class that inherits from a Selenium Class, given a "municipio" it extracts the population now, the population five years ago
+# Class that borrows a Selenium session from the driver pool, given a "municipio" it extracts the population now, the population five years ago
 import logging
-import time
 from typing import Union
 
 import INE.constants as const
@@ -9,14 +8,15 @@ import regex
 
 # A través del catastro, voy a poder sacar el municipio
 # A través de la web de correos, voy a poder sacar la localidad
-from selenium import webdriver
+from Cache.scrape_cache import cached_scrape
+from Driver.driver_pool import PooledChrome
 from selenium.webdriver.common.by import By
 from unidecode import unidecode  # To remove acentos
 
 logger = logging.getLogger(__name__)
 
 
-class InePopulation(webdriver.Chrome):
+class InePopulation(PooledChrome):
 
     # Class attribute to store all instances
     all = []
@@ -29,6 +29,7 @@ class InePopulation(webdriver.Chrome):
         ref: str,
         place: str,
         locality: str,
+        municipio: str = None,
         debug=False,
     ):
 
@@ -41,28 +42,26 @@ class InePopulation(webdriver.Chrome):
         assert isinstance(
             locality, (str, type(None))
         ), f"Locality {locality} must be a string or None!"
+        assert isinstance(
+            municipio, (str, type(None))
+        ), f"Municipio {municipio} must be a string or None!"
         assert isinstance(debug, bool), f"Debug {debug} must be a boolean!"
 
-        options = webdriver.ChromeOptions()
-        options.add_experimental_option("detach", True)
-        options.add_argument("--disable-search-engine-choice-screen")
-        options.add_experimental_option("excludeSwitches", ["enable-logging"])
-        super().__init__(options=options)
-        self.implicitly_wait(15)
-        self.maximize_window()
+        super().__init__(implicit_wait=15)
         self.delegation = delegation
         self.lote = lote
         self.land = land
         self.ref = ref
         self.place = unidecode(place.lower())
         self.locality = locality
+        self.municipio = municipio
         self.debug = debug
 
         # Append new instance to the class attribute list
         InePopulation.all.append(self)
 
     def __repr__(self):
-        return f"InePopulation({self.delegation}, {self.lote}, {self.land}, '{self.ref}', '{self.place}', '{self.locality}','{self.debug}')"
+        return f"InePopulation({self.delegation}, {self.lote}, {self.land}, '{self.ref}', '{self.place}', '{self.locality}', '{self.municipio}', '{self.debug}')"
 
     def __str__(self):
         return (
@@ -73,9 +72,17 @@ class InePopulation(webdriver.Chrome):
             f"  Ref: {self.ref}\n"
             f"  Place: {self.place}\n"
             f"  Locality: {self.locality}\n"
+            f"  Municipio: {self.municipio}\n"
             f"  Debug: {self.debug}"
         )
 
+    # The result is cached per locality and municipio (see 'Cache/scrape_cache.py').
+    # Without the municipio, the whole 'place' is used instead.
+    @cached_scrape(
+        "ine_population",
+        key=lambda self: (self.locality, self.municipio or self.place),
+        is_valid=lambda data: data != const.EMPTY_DICTIONARY_POPULATION,
+    )
     def get_data(self) -> dict[str, Union[int, float]]:
         try:
             # Check if the data scraped from Correos work successfully or not
@@ -112,8 +119,7 @@ class InePopulation(webdriver.Chrome):
 
         finally:
             if self.debug == False:
-                self.quit()
-                time.sleep(1)
+                self.release_driver()
 
     #
     #
@@ -1,16 +1,16 @@
-# Class that inherits from a Selenium class. Given the referencia catastral of a property,
+# Class that borrows a Selenium session from the driver pool. Given the referencia catastral of a property,
 # and the kml, it scrapes some data and take several screenshots of differents layers.
 # This class will only be used for the rústicas fincas, since it doesn't have a lot of sense
 # to download the LIDAR, usos suelo, curvas nivel, hidrografia and usos suelos data, for an
 # apartment that is on the middle of a city
 import logging
 import sys
-import time
 from pathlib import Path
 
 import Iberpix.constants as const
 import logger_config
-from selenium import webdriver
+from Driver.driver_pool import PooledChrome
+from Driver.waits import wait_for_map_idle
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
@@ -19,7 +19,7 @@ from selenium.webdriver.support.ui import WebDriverWait
 logger = logging.getLogger(__name__)
 
 
-class Iberpix(webdriver.Chrome):
+class Iberpix(PooledChrome):
 
     # Class attribute to store all instances
     all = []
@@ -45,25 +45,7 @@ class Iberpix(webdriver.Chrome):
         assert isinstance(clase, str), f"Clase {clase} must be a string!"
         assert isinstance(debug, bool), f"Debug {debug} must be a boolean!"
 
-        options = webdriver.ChromeOptions()
-        # Keep the browser open after the WebDriver session is terminated.
-        options.add_experimental_option("detach", True)
-        options.add_argument("--disable-search-engine-choice-screen")
-        # It supresses the logging messages that Chrome outputs to the console
-        options.add_experimental_option("excludeSwitches", ["enable-logging"])
-        #
-        options.add_experimental_option(
-            "prefs",
-            {
-                "download.default_directory": str(const.DOWNLOAD_DIR),
-                "download.prompt_for_download": False,  # Automatically save files to the specified directory without asking
-                "download.directory_upgrade": True,  # Browser will not prompt the user when the download directory is changed
-                "safebrowsing.enabled": True,  # Dunno the reason, maybe without it something pop-up alerting me or something
-            },
-        )
-        super().__init__(options=options)
-        self.implicitly_wait(15)
-        self.maximize_window()
+        super().__init__(download_dir=const.DOWNLOAD_DIR, implicit_wait=15)
         self.delegation = delegation
         self.lote = lote
         self.land = land
@@ -179,8 +161,7 @@ class Iberpix(webdriver.Chrome):
             return const.EMPTY_DICTIONARY
         finally:
             if self.debug == False:
-                self.quit()
-                time.sleep(1)
+                self.release_driver()
 
     #
     #
@@ -314,10 +295,10 @@ class Iberpix(webdriver.Chrome):
 
         actions.move_to_element(info_section).click().perform()
 
-        time.sleep(5)
-
-        expand_data_land_usos_suelo = self.find_element(
-            By.XPATH, '//div[p[strong[contains(text(), "del suelo")]]]'
+        expand_data_land_usos_suelo = WebDriverWait(self, 30).until(
+            EC.element_to_be_clickable(
+                (By.XPATH, '//div[p[strong[contains(text(), "del suelo")]]]')
+            )
         )
         expand_data_land_usos_suelo.click()
 
@@ -439,9 +420,9 @@ class Iberpix(webdriver.Chrome):
     # When called it takes a screenshot of the web, and save it with the filename
     # that we pass as an argument
     def __my_get_screenshot(self, filename, layer):
-        # The background layers takes a bit of time to load. If i dont set any time, the screenshot
+        # The background layers takes a bit of time to load. If i dont wait for them, the screenshot
         # is wrong, and i see nothing
-        time.sleep(5)
+        wait_for_map_idle(self)
 
         # Build the filename that will have our downloader file
         path = const.DOWNLOAD_DIR / filename
@@ -0,0 +1,147 @@
+# Batch mode: scrape many lands at the same time.
+# Every land (delegation, lote, land) is put on a work queue that is drained by N workers.
+# Each worker scrapes its land (borrowing browser sessions from the driver pool) and sends
+# the result to the database thread, which is the only one that writes on the db.
+
+import logging
+import queue
+import threading
+
+import logger_config
+import Pipeline.constants as const
+from Database.helpers import insert_land_data, submit_to_db_thread
+from Pipeline.journal import RunJournal
+from Pipeline.land import process_land
+
+logger = logging.getLogger(__name__)
+
+
+# A task is a dictionary with the arguments of 'process_land' for one land
+def build_task(id_land: tuple, id_auction, price, auction_pdf_path) -> dict:
+    return {
+        "id_land": id_land,
+        "id_auction": id_auction,
+        "price": price,
+        "auction_pdf_path": auction_pdf_path,
+    }
+
+
+# Tasks of all the lands of an auction (as returned by 'discover_auctions')
+def build_auction_tasks(auction: dict) -> list[dict]:
+    tasks = []
+    for lote in auction["lotes"]:
+        i_lote = lote["id"]
+        data_lote = lote["data"]
+
+        # If a lote of an auction couldnt be properly proccesed, continue
+        if not data_lote["refs"]:
+            continue
+
+        for i_land, land in enumerate(data_lote["refs"], 1):
+            # Tuple containing key arguments
+            id_land = (auction["delegation"], i_lote, i_land, land)
+            tasks.append(
+                build_task(
+                    id_land,
+                    auction["id_auction"],
+                    data_lote["price"],
+                    auction["auction_pdf_path"],
+                )
+            )
+    return tasks
+
+
+# Scrape and insert on the db all the lands of the tasks.
+# With a journal, the progress of every land is recorded (see 'journal.py').
+# The number of lands scraped at the same time is N_LAND_WORKERS (see 'main.py').
+# Returns the number of lands inserted.
+def run_batch(
+    tasks: list[dict],
+    n_workers: int,
+    mode: str = "BASIC",
+    n_emp: int = 1,
+    journal: RunJournal = None,
+) -> int:
+
+    # Validate the data types of our arguments
+    assert n_workers > 0, f"N_workers {n_workers} is not greater than zero!"
+
+    work = queue.Queue()
+    for task in tasks:
+        work.put(task)
+
+    # Pending inserts on the database thread
+    writes = []
+    writes_lock = threading.Lock()
+
+    # The land is done once it's inserted on the database
+    def record_insert(task, write):
+        if write.exception():
+            journal.record_land(task, const.JOURNAL_FAILED)
+        else:
+            journal.record_land(task, const.JOURNAL_DONE)
+
+    def worker():
+        while True:
+            try:
+                task = work.get_nowait()
+            except queue.Empty:
+                return
+
+            id_land = task["id_land"]
+            try:
+                full_data_land = process_land(
+                    id_land,
+                    task["id_auction"],
+                    task["price"],
+                    task["auction_pdf_path"],
+                    mode,
+                    n_emp,
+                    journal,
+                    task,
+                )
+            except Exception:
+                # Log
+                msg = f"Failed to scrape land '{id_land[3]}'."
+                logger.error(
+                    f"{logger_config.build_id(*id_land[:3])}{msg}", exc_info=True
+                )
+                full_data_land = None
+
+            if full_data_land is None:
+                if journal:
+                    journal.record_land(task, const.JOURNAL_FAILED)
+                continue
+
+            write = submit_to_db_thread(insert_land_data, full_data_land)
+            if journal:
+                write.add_done_callback(
+                    lambda write, task=task: record_insert(task, write)
+                )
+            with writes_lock:
+                writes.append((id_land, write))
+
+    workers = [
+        threading.Thread(target=worker, name=f"land_{i}")
+        for i in range(min(n_workers, work.qsize()))
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+
+    n_inserted = 0
+    for id_land, write in writes:
+        try:
+            write.result()
+            n_inserted += 1
+        except Exception:
+            # Log
+            msg = f"Failed to insert land '{id_land[3]}' on database."
+            logger.error(f"{logger_config.build_id(*id_land[:3])}{msg}", exc_info=True)
+
+    # Log
+    msg = f"Batch finished: {n_inserted}/{len(tasks)} lands inserted on database."
+    logger.info(msg)
+
+    return n_inserted
@@ -0,0 +1,5 @@
+# Journal of the last run (see 'journal.py')
+JOURNAL_NAME = "RunJournal.db"
+JOURNAL_PENDING = "pending"
+JOURNAL_DONE = "done"
+JOURNAL_FAILED = "failed"
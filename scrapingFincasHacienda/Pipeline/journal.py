@@ -0,0 +1,214 @@
+# Journal of the last run, so a run that crashed (browser crash, site timeout...) can be
+# continued with 'python main.py --resume' instead of crawling everything again.
+# It's a SQLite file (independent of the database of the lands) that records:
+#   - The tasks (lands) of the run, and if they were inserted on the database or not.
+#   - The steps of every land that finished with valid outputs (see 'Step.is_valid'), pickled.
+# When resuming, only the lands that weren't inserted are scraped again, and only the steps
+# that didn't finish are run (the outputs of the rest are read from the journal).
+# A normal run (without '--resume') also runs first the lands that the last run didn't finish.
+
+import logging
+import pickle
+import sqlite3
+import threading
+
+import logger_config
+import Pipeline.constants as const
+from Cache.scrape_cache import files_exist
+from Pipeline.scheduler import Step
+
+logger = logging.getLogger(__name__)
+
+
+class RunJournal:
+    def __init__(self, path=const.JOURNAL_NAME):
+        # The steps of all the lands record their progress from different threads
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        sql_tasks = """
+            CREATE TABLE IF NOT EXISTS "tasks" (
+                "id" INTEGER,
+                "task" BLOB NOT NULL,
+                "status" TEXT NOT NULL DEFAULT 'pending',
+                PRIMARY KEY ("id")
+            )
+            """
+        sql_steps = """
+            CREATE TABLE IF NOT EXISTS "steps" (
+                "task_id" INTEGER NOT NULL,
+                "step" TEXT NOT NULL,
+                "status" TEXT NOT NULL,
+                "outputs" BLOB,
+                PRIMARY KEY ("task_id", "step"),
+                FOREIGN KEY ("task_id") REFERENCES "tasks"("id")
+            )
+            """
+        with self.connection:
+            self.connection.execute(sql_tasks)
+            self.connection.execute(sql_steps)
+
+    # Starts a new run. Returns the tasks with their id on the journal ('journal_id').
+    # The lands of the previous run that never finished (it crashed) are kept, with the steps
+    # they finished, and they're run first. Otherwise they'd be lost, because their auction is
+    # already (partially) on database and it isn't scraped again. The lands that failed are dropped.
+    def start_run(self, tasks: list[dict]) -> list[dict]:
+        unfinished = self.__get_tasks(const.JOURNAL_PENDING)
+        failed = self.__get_tasks(const.JOURNAL_FAILED)
+
+        if unfinished:
+            # Log
+            msg = f"The last run didn't finish, so its {len(unfinished)} pending lands are run again: {RunJournal.__lands(unfinished)}"
+            logger.warning(msg)
+        if failed:
+            # Log
+            msg = f"The {len(failed)} lands that failed on the last run are dropped: {RunJournal.__lands(failed)}"
+            logger.warning(msg)
+
+        with self.lock, self.connection:
+            self.connection.execute(
+                'DELETE FROM "steps" WHERE "task_id" IN (SELECT "id" FROM "tasks" WHERE "status"!=?)',
+                (const.JOURNAL_PENDING,),
+            )
+            self.connection.execute(
+                'DELETE FROM "tasks" WHERE "status"!=?', (const.JOURNAL_PENDING,)
+            )
+            journal_tasks = list(unfinished)
+            kept_tasks = [RunJournal.__without_id(task) for task in unfinished]
+            for task in tasks:
+                # The same land may be on the new run too (i.e. the same txt file)
+                if task in kept_tasks:
+                    continue
+                cursor = self.connection.execute(
+                    'INSERT INTO "tasks" ("task", "status") VALUES (?, ?)',
+                    (pickle.dumps(task), const.JOURNAL_PENDING),
+                )
+                journal_tasks.append({**task, "journal_id": cursor.lastrowid})
+        return journal_tasks
+
+    # Tasks of the last run whose land wasn't inserted on the database (crashed or failed)
+    def get_pending_tasks(self) -> list[dict]:
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT "id", "task" FROM "tasks" WHERE "status" != ? ORDER BY "id"',
+                (const.JOURNAL_DONE,),
+            ).fetchall()
+        return [{**pickle.loads(task), "journal_id": task_id} for task_id, task in rows]
+
+    # Status of the land: JOURNAL_DONE once it's inserted on the database, JOURNAL_FAILED otherwise
+    def record_land(self, task: dict, status: str) -> None:
+        with self.lock, self.connection:
+            self.connection.execute(
+                'UPDATE "tasks" SET "status"=? WHERE "id"=?',
+                (status, task["journal_id"]),
+            )
+
+    def record_step(self, task: dict, step: str, status: str, outputs=None) -> None:
+        with self.lock, self.connection:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO "steps" ("task_id", "step", "status", "outputs") VALUES (?, ?, ?, ?)',
+                (task["journal_id"], step, status, outputs),
+            )
+
+    # Outputs of the steps of the land that already finished {step: outputs}
+    def get_completed_steps(self, task: dict) -> dict[str, dict]:
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT "step", "outputs" FROM "steps" WHERE "task_id"=? AND "status"=?',
+                (task["journal_id"], const.JOURNAL_DONE),
+            ).fetchall()
+        completed = {}
+        for step, outputs in rows:
+            outputs = pickle.loads(outputs)
+            # The files that the step downloaded may have been deleted since then
+            if files_exist(outputs):
+                completed[step] = outputs
+        return completed
+
+    # Given the steps of a land, returns:
+    #   1) The outputs of the steps that already finished (initial values of 'run_steps')
+    #   2) The rest of the steps, which record their outputs on the journal when they finish
+    def resume_steps(self, task: dict, steps: list[Step]) -> tuple[dict, list[Step]]:
+        completed = self.get_completed_steps(task)
+        values = {}
+        pending = []
+        for step in steps:
+            if step.name in completed:
+                values.update(completed[step.name])
+            else:
+                pending.append(
+                    Step(
+                        step.name,
+                        self.__journaled(task, step),
+                        step.inputs,
+                        step.outputs,
+                        step.is_valid,
+                    )
+                )
+
+        if completed:
+            # Log
+            delegation, i_lote, i_land, land = task["id_land"]
+            msg = f"Resuming land '{land}', steps {sorted(completed)} already finished."
+            logger.info(f"{logger_config.build_id(delegation, i_lote, i_land)}{msg}")
+
+        return values, pending
+
+    def close(self) -> None:
+        self.connection.close()
+
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+    ################################### PRIVATE METHODS ############################################
+    #
+    #
+    #
+    #
+    #
+    #
+    #
+
+    # Tasks of the last run with the status
+    def __get_tasks(self, status: str) -> list[dict]:
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT "id", "task" FROM "tasks" WHERE "status"=? ORDER BY "id"',
+                (status,),
+            ).fetchall()
+        return [{**pickle.loads(task), "journal_id": task_id} for task_id, task in rows]
+
+    @staticmethod
+    def __without_id(task: dict) -> dict:
+        return {key: value for key, value in task.items() if key != "journal_id"}
+
+    # Names the lands of the tasks (to log them)
+    @staticmethod
+    def __lands(tasks: list[dict]) -> str:
+        return ", ".join(f"'{task['id_land'][3]}'" for task in tasks)
+
+    # Wraps the function of the step, so its result is recorded on the journal
+    def __journaled(self, task: dict, step: Step):
+        def function(**inputs):
+            try:
+                results = step.function(**inputs)
+            except Exception:
+                self.record_step(task, step.name, const.JOURNAL_FAILED)
+                raise
+            outputs = {key: results[key] for key in step.outputs if key in results}
+            # The scraper failed (it returned its empty values), so the step'll be run again
+            if not step.is_valid(outputs):
+                self.record_step(task, step.name, const.JOURNAL_FAILED)
+                return results
+            try:
+                pickled_outputs = pickle.dumps(outputs)
+            except Exception:
+                # Outputs that can't be pickled can't be resumed, the step'll be run again
+                return results
+            self.record_step(task, step.name, const.JOURNAL_DONE, pickled_outputs)
+            return results
+
+        return function
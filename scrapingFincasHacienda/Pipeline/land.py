@@ -0,0 +1,339 @@
+# Scraping of a land as a graph of steps (see 'scheduler.py').
+# Dependencies between the scrapers:
+#   catastro ──┬── catastro_report
+#              ├── iberpix
+#              └── correos ──┬── ine_population
+#                            ├── ine_transmisiones
+#                            └── sabi ──┐
+#   catastro_media ──┬──────────────────┴── google_maps_two_directions
+#                    └── google_maps_one_direction
+# So i.e. the report, Iberpix and Correos are scraped at the same time once Catastro finishes.
+# 'catastro' only requests the data and the KML (HTTP), and the ortofoto screenshot of
+# 'catastro_media' is taken with a browser in parallel with the rest.
+
+import logging
+
+import Catastro.constants as catastro_const
+import Correos.constants as correos_const
+import Iberpix.constants as iberpix_const
+import INE.constants as ine_const
+import logger_config
+from Catastro.catastro import Catastro
+from Catastro.report import CatastroReport
+from Correos.correos import Correos
+from Correos.postcode_index import PostcodeIndex
+from Database.helpers import (
+    is_ine_population_in_db,
+    is_ine_transmisiones_rust_in_db,
+    is_sabi_in_db,
+    run_in_db_thread,
+)
+from GoogleMaps.GoogleMaps import GoogleMaps
+from Iberpix.iberpix import Iberpix
+from INE.ine_num_transmisiones_fincas_rusticas import IneNumTransmisionesFincasRusticas
+from INE.ine_population import InePopulation
+from Pipeline.scheduler import Step, run_steps
+from Sabi.sabi import Sabi
+from utils import convert_paths, full_get_data_two_directions
+
+logger = logging.getLogger(__name__)
+
+# Value of every output when its step is not run (BASIC mode), it fails or it's skipped
+DEFAULT_VALUES = {
+    "coordinates_land": "",
+    "path_ortofoto_land": None,
+    "data_correos": correos_const.EMPTY_DICTIONARY,
+    "path_googlemaps_land": None,
+    "report_data_land": catastro_const.EMPTY_DICTIONARY,
+    "value_land": None,
+    "path_report_land": None,
+    "data_ine_population": ine_const.EMPTY_DICTIONARY_POPULATION,
+    "data_ine_transmisiones": ine_const.EMPTY_DICTIONARY_FINCAS,
+    "data_usos_suelo": iberpix_const.EMPTY_DICTIONARY_DATA,
+    "paths_iberpix": iberpix_const.EMPTY_DICTIONARY_PATHS,
+    "data_sabi": None,
+    "full_data_two_directions": None,
+}
+
+
+# Most of the scrapers catch their own errors and return the default value of their output, so
+# the step is only valid (see 'Step.is_valid') when the output isn't its default value.
+# The steps that read nothing because the data is already on db (or the land isn't 'Rústico')
+# aren't valid either, but running them again is cheap (they don't scrape).
+def is_scraped(key: str):
+    default = DEFAULT_VALUES[key]
+    if default is None:
+        return lambda outputs: outputs[key] is not None
+    return lambda outputs: outputs[key] != default
+
+
+# Scrape all the data of a land, and return the dictionary that is inserted on the db.
+# Returns None if the land couldn't be scraped from Catastro (the rest of the steps need its
+# data, and the ortofoto and the KML are mandatory on database).
+# 'journal' (a 'RunJournal') and 'task' are only given on batch mode (see 'journal.py').
+def process_land(
+    id_land: tuple,
+    id_auction,
+    price,
+    auction_pdf_path,
+    mode: str = "BASIC",
+    n_emp: int = 1,
+    journal=None,
+    task: dict = None,
+):
+
+    # Validate the data types of our arguments
+    assert mode in ["BASIC", "ADVANCED"], f"Mode {mode} must be 'BASIC' or 'ADVANCED'"
+
+    delegation, i_lote, i_land, land = id_land
+    steps = build_land_steps(id_land, mode, n_emp)
+    values = {}
+
+    # When a run is journaled, the steps that already finished (on a previous run that
+    # crashed) aren't run again, and the rest record their outputs
+    if journal:
+        values, steps = journal.resume_steps(task, steps)
+
+    results = run_steps(
+        steps,
+        values,
+        log_id=logger_config.build_id(delegation, i_lote, i_land),
+    )
+
+    # Catastro data, KML and ortofoto are mandatory (the ortofoto and the KML are NOT NULL
+    # on database, so the land couldn't be inserted without them)
+    missing = [
+        key
+        for key in ("data_land", "path_kml_land", "path_ortofoto_land")
+        if not results.get(key)
+    ]
+    if missing:
+        # Log
+        msg = f"Land '{land}' is skipped, the mandatory values {missing} couldn't be scraped from Catastro."
+        logger.error(f"{logger_config.build_id(delegation, i_lote, i_land)}{msg}")
+        return None
+
+    values = {**DEFAULT_VALUES, **results}
+    data_land = values["data_land"]
+    report_data_land = values["report_data_land"]
+    data_correos = values["data_correos"]
+    paths_iberpix = values["paths_iberpix"]
+
+    # This is the info that I'll introduce in the db for each land.
+    return {
+        ############### MANDATORY ############
+        "electronical_id": id_auction,
+        "delegation": delegation,
+        "lote_number": i_lote,
+        "referencia_catastral": land,
+        "price": price,
+        "localizacion": data_land["localizacion"],
+        "municipio": data_land["municipio"],
+        "clase": data_land["clase"],
+        "uso": data_land["uso"],
+        "aprovechamiento": data_land["cultivo"],
+        "coordenadas": values["coordinates_land"],
+        "codigo_postal": data_correos["cp"],
+        "province": data_land["provincia"],
+        "locality": data_correos["locality"],
+        ############### OPTIONAL ##############
+        # '**' This notation is used to expand a dictionary
+        "ath_number": report_data_land["ath"],
+        "ath_name": report_data_land["denominacion_ath"],
+        "agrupacion_cultivo": report_data_land["agrupacion_cultivo"],
+        "agrupacion_municipio": report_data_land["agrupacion_municipio"],
+        "number_buildings": report_data_land["number_buildings"],
+        "slope": report_data_land["slope"],
+        "fls": report_data_land["fls"],
+        "population_now": values["data_ine_population"]["population_now"],
+        "population_before": values["data_ine_population"]["population_before"],
+        "rusticas_transactions_now": values["data_ine_transmisiones"][
+            "transactions_now"
+        ],
+        "rusticas_transactions_before": values["data_ine_transmisiones"][
+            "transactions_before"
+        ],
+        "catastro_value": values["value_land"],
+        "empresas": values["data_sabi"],
+        "empresas_fincas": values["full_data_two_directions"],
+        "usos_suelo": values["data_usos_suelo"],
+        ############### FILES ##############
+        **convert_paths(
+            auction_pdf_path,
+            values["path_ortofoto_land"],
+            values["path_kml_land"],
+            values["path_googlemaps_land"],
+            values["path_report_land"],
+            paths_iberpix["curvas_nivel"],
+            paths_iberpix["lidar"],
+            paths_iberpix["usos_suelo"],
+            paths_iberpix["ortofoto_hidrografia"],
+        ),
+    }
+
+
+# Steps needed to scrape a land on the given mode.
+# *id_land = to unpack the tuple into separate arguments
+def build_land_steps(id_land: tuple, mode: str, n_emp: int) -> list[Step]:
+
+    # 7.1) CATASTRO CLASS
+    def catastro():
+        info_land = Catastro(*id_land, mode=mode).get_land_data()
+        return {"data_land": info_land["data"], "path_kml_land": info_land["kml"]}
+
+    # The coordinates are only read on ADVANCED mode (they're needed by Google Maps)
+    def catastro_media():
+        info_media = Catastro(*id_land, mode=mode).get_media()
+        return {
+            "coordinates_land": info_media["coordinates"],
+            "path_ortofoto_land": info_media["ortofoto"],
+        }
+
+    # 7.2) CORREOS_CLASS
+    # Most lands are resolved with the postcode index, Correos is only scraped on a miss
+    def correos(data_land):
+        data_correos = PostcodeIndex().lookup(
+            *id_land, data_land["localizacion"], data_land["municipio"]
+        )
+        if data_correos is None:
+            data_correos = Correos(*id_land, data_land["localizacion"]).get_data()
+        return {"data_correos": data_correos}
+
+    # 7.3) GOOGLE_MAPS CLASS
+    def google_maps_one_direction(coordinates_land):
+        path = GoogleMaps(*id_land, coordinates_land).get_data_one_direction()
+        return {"path_googlemaps_land": path}
+
+    # 7.4) CATASTRO_REPORT CLASS
+    def catastro_report(data_land):
+        info_report = CatastroReport(*id_land, data_land["clase"]).get_data()
+        return {
+            "report_data_land": info_report["data"],
+            "value_land": info_report["value"],
+            "path_report_land": info_report["path"],
+        }
+
+    # 7.5) INE_POPULATION CLASS
+    # If not stored on db, then it should be scraped
+    def ine_population(data_land, data_correos):
+        if run_in_db_thread(
+            is_ine_population_in_db,
+            *id_land,
+            data_correos["locality"],
+            data_land["municipio"],
+        ):
+            return {"data_ine_population": ine_const.EMPTY_DICTIONARY_POPULATION}
+        data_ine_population = InePopulation(
+            *id_land,
+            data_land["localizacion"],
+            data_correos["locality"],
+            data_land["municipio"],
+        ).get_data()
+        return {"data_ine_population": data_ine_population}
+
+    # 7.6) INE_NUMBER_TRANSMISIONES CLASS
+    # If not stored on db, then it should be scraped
+    def ine_transmisiones(data_land, data_correos):
+        if run_in_db_thread(
+            is_ine_transmisiones_rust_in_db, *id_land, data_correos["cp"]
+        ):
+            return {"data_ine_transmisiones": ine_const.EMPTY_DICTIONARY_FINCAS}
+        data_ine_transmisiones = IneNumTransmisionesFincasRusticas(
+            *id_land, data_correos["cp"], data_land["clase"]
+        ).get_data()
+        return {"data_ine_transmisiones": data_ine_transmisiones}
+
+    # 7.7) IBERPIX CLASS
+    def iberpix(data_land, path_kml_land):
+        info_iberpix = Iberpix(*id_land, path_kml_land, data_land["clase"]).get_data()
+        return {
+            "data_usos_suelo": info_iberpix["data"],
+            "paths_iberpix": info_iberpix["paths"],
+        }
+
+    # 7.8) SA_-_BI CLASS
+    # 'data_sabi' contains a df with 23 columns and up to <n> enterprises
+    # If not stored on db, then it should be scraped
+    def sabi(data_correos):
+        if run_in_db_thread(is_sabi_in_db, *id_land, data_correos["cp"]):
+            return {"data_sabi": None}
+        data_sabi = Sabi(*id_land, data_correos["cp"], n_emp=n_emp).get_data()
+        return {"data_sabi": data_sabi}
+
+    # 7.9) GOOGLE MAPS CLASS
+    # 'full_data_two_directions' contain data up to <n> enterprises given a land
+    def google_maps_two_directions(coordinates_land, data_sabi):
+        full_data_two_directions = full_get_data_two_directions(
+            *id_land, coordinates_land, data_sabi
+        )
+        return {"full_data_two_directions": full_data_two_directions}
+
+    steps = [
+        Step("catastro", catastro, outputs=("data_land", "path_kml_land")),
+        Step(
+            "catastro_media",
+            catastro_media,
+            outputs=("coordinates_land", "path_ortofoto_land"),
+            is_valid=is_scraped("path_ortofoto_land"),
+        ),
+        Step(
+            "catastro_report",
+            catastro_report,
+            inputs=("data_land",),
+            outputs=("report_data_land", "value_land", "path_report_land"),
+            is_valid=is_scraped("value_land"),
+        ),
+        Step(
+            "iberpix",
+            iberpix,
+            inputs=("data_land", "path_kml_land"),
+            outputs=("data_usos_suelo", "paths_iberpix"),
+            is_valid=is_scraped("paths_iberpix"),
+        ),
+    ]
+    if mode == "ADVANCED":
+        steps += [
+            Step(
+                "correos",
+                correos,
+                inputs=("data_land",),
+                outputs=("data_correos",),
+                is_valid=is_scraped("data_correos"),
+            ),
+            Step(
+                "google_maps_one_direction",
+                google_maps_one_direction,
+                inputs=("coordinates_land",),
+                outputs=("path_googlemaps_land",),
+                is_valid=is_scraped("path_googlemaps_land"),
+            ),
+            Step(
+                "ine_population",
+                ine_population,
+                inputs=("data_land", "data_correos"),
+                outputs=("data_ine_population",),
+                is_valid=is_scraped("data_ine_population"),
+            ),
+            Step(
+                "ine_transmisiones",
+                ine_transmisiones,
+                inputs=("data_land", "data_correos"),
+                outputs=("data_ine_transmisiones",),
+                is_valid=is_scraped("data_ine_transmisiones"),
+            ),
+            Step(
+                "sabi",
+                sabi,
+                inputs=("data_correos",),
+                outputs=("data_sabi",),
+                is_valid=is_scraped("data_sabi"),
+            ),
+            Step(
+                "google_maps_two_directions",
+                google_maps_two_directions,
+                inputs=("coordinates_land", "data_sabi"),
+                outputs=("full_data_two_directions",),
+                is_valid=is_scraped("full_data_two_directions"),
+            ),
+        ]
+    return steps
@@ -0,0 +1,123 @@
+# Small dependency-graph executor used to scrape a land.
+# Each step declares which values it needs (inputs) and which values it produces (outputs).
+# Every step whose inputs are ready runs in parallel with the others, so the time needed
+# for a land is the length of the longest chain of dependencies, instead of the sum of all the steps.
+
+import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable
+
+from Driver.driver_pool import DriverPool
+
+logger = logging.getLogger(__name__)
+
+
+class Step:
+    # The function receives the inputs as keyword arguments, and
+    # returns a dictionary whose keys are the outputs.
+    # 'is_valid' tells if the outputs are a success. Some scrapers catch their own errors and
+    # return empty values, so those outputs aren't resumed from the journal (see 'journal.py').
+    def __init__(
+        self,
+        name: str,
+        function: Callable[..., dict],
+        inputs: tuple[str, ...] = (),
+        outputs: tuple[str, ...] = (),
+        is_valid: Callable[[dict], bool] = lambda outputs: True,
+    ):
+
+        # Validate the data types of our arguments
+        assert isinstance(name, str), f"Name {name} must be a string!"
+        assert callable(function), f"Function {function} must be callable!"
+        assert callable(is_valid), f"Is_valid {is_valid} must be callable!"
+        assert outputs, f"Step '{name}' must have at least one output!"
+
+        self.name = name
+        self.function = function
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.is_valid = is_valid
+
+    def __repr__(self):
+        return f"Step('{self.name}', {self.inputs}, {self.outputs})"
+
+    def run(self, values: dict) -> dict:
+        results = self.function(**{key: values[key] for key in self.inputs})
+        missing = set(self.outputs) - set(results)
+        assert not missing, f"Step '{self.name}' didn't return the outputs {missing}"
+        return {key: results[key] for key in self.outputs}
+
+
+# Runs the steps and returns a dictionary with all the values (the initial ones plus the outputs).
+# When a step fails, its outputs are missing from the dictionary, and
+# the steps that depend on them are skipped.
+# Most of the steps hold a browser session, so by default as many steps run at the same time
+# as sessions has the driver pool.
+def run_steps(
+    steps: list[Step],
+    values: dict = None,
+    max_workers: int = None,
+    log_id: str = "",
+) -> dict:
+    max_workers = max_workers or DriverPool().size
+
+    # Validate the data types of our arguments
+    assert max_workers > 0, f"Max_workers {max_workers} is not greater than zero!"
+
+    values = dict(values or {})
+    validate_steps(steps, values)
+
+    pending = list(steps)
+    running = {}  # future -> step
+    unavailable = set()  # outputs of the steps that failed or were skipped
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="step"
+    ) as executor:
+        while pending or running:
+            for step in list(pending):
+                if unavailable.intersection(step.inputs):
+                    pending.remove(step)
+                    unavailable.update(step.outputs)
+
+                    # Log
+                    msg = f"Step '{step.name}' skipped, some of its inputs {step.inputs} are not available."
+                    logger.warning(f"{log_id}{msg}")
+
+                elif all(key in values for key in step.inputs):
+                    pending.remove(step)
+                    running[executor.submit(step.run, values)] = step
+
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                step = running.pop(future)
+                try:
+                    values.update(future.result())
+                except Exception:
+                    unavailable.update(step.outputs)
+
+                    # Log
+                    msg = f"Step '{step.name}' failed."
+                    logger.error(f"{log_id}{msg}", exc_info=True)
+
+    return values
+
+
+# Check that every output is produced by only one step, and
+# that the inputs of every step can be produced (so there are no cycles)
+def validate_steps(steps: list[Step], values: dict) -> None:
+    outputs = [key for step in steps for key in step.outputs]
+    duplicated = {key for key in outputs if outputs.count(key) > 1}
+    assert not duplicated, f"Outputs {duplicated} are produced by more than one step!"
+
+    available = set(values)
+    pending = list(steps)
+    while pending:
+        ready = [step for step in pending if available.issuperset(step.inputs)]
+        assert ready, f"Steps {pending} have inputs that can't be produced!"
+        for step in ready:
+            pending.remove(step)
+            available.update(step.outputs)
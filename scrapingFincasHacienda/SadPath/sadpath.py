@@ -4,6 +4,7 @@ import sys
 import logger_config
 import requests
 import SadPath.constants as const
+from Cache.scrape_cache import ScrapeCache
 from Catastro.catastro import Catastro
 from Catastro.report import CatastroReport
 from Correos.correos import Correos
@@ -152,18 +153,20 @@ def check_iberpix():
     check_class_works(iberpix, "iberpix")
 
 
+# The results of the scrapers are not read from the cache, the webpages are really scraped
 def check_webpages_work(MODE):
     msg = f"################## SAD PATH CHECKING ##################"
     logger.info(f"{msg}")
 
-    check_hacienda()
-    check_catastro(MODE)
-    check_iberpix()
+    with ScrapeCache().bypass():
+        check_hacienda()
+        check_catastro(MODE)
+        check_iberpix()
 
-    if MODE == "ADVANCED":
-        check_correos()
-        check_googlemaps()
-        check_ine()
+        if MODE == "ADVANCED":
+            check_correos()
+            check_googlemaps()
+            check_ine()
 
     msg = f"################## FINISH SAD PATH CHECKING ##################"
     logger.info(f"{msg}")
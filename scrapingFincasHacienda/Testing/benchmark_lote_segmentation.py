@@ -0,0 +1,103 @@
+# Compares the lote segmentation engine ('Hacienda/lote_segmentation.py') with the patterns of
+# 'Hacienda/constants.py' searched over the whole text, on a folder of saved pliegos (PDF or the
+# text already extracted, '.txt').
+# For each pliego, it checks that both return the same lotes and referencias catastrales,
+# and it shows the time that each one takes.
+#
+# Usage (from 'scrapingFincasHacienda'):
+#   python -m Testing.benchmark_lote_segmentation <folder of pliegos> [repetitions]
+
+import sys
+import time
+from pathlib import Path
+
+import Hacienda.constants as const
+import regex
+from Hacienda.lote_segmentation import find_refs, segment_lotes
+from Hacienda.pdf_text import count_pages, extract_pages_text
+
+
+# The same text that 'CachedPdf.get_text' returns
+def read_pliego(path: Path) -> str:
+    if path.suffix.lower() == ".txt":
+        return path.read_text(encoding="utf-8")
+    content = path.read_bytes()
+    pages = extract_pages_text(content, range(count_pages(content)))
+    return " ".join(pages[number] for number in sorted(pages))
+
+
+# Lotes and referencias catastrales of each lote, with 'regex.findall' over the whole text
+# (as 'get_lotes' and 'get_ref_catastral' did before the engine)
+def segment_with_findall(text: str) -> tuple[dict, list]:
+    if regex.search(const.CHECKER_SECOND_STRUCTURE_PATTERN, text):
+        structure = "paragraphs"
+        lotes = regex.findall(const.SECOND_PARAGRAPHS_PATTERN, text)
+    else:
+        structure = "tables"
+        lotes = regex.findall(const.FIRST_PARAGRAPHS_PATTERN, text)
+    refs = [regex.findall(const.REF_CATASTRAL_PATTERN, lote) for lote in lotes]
+    return {"structure": structure, "text": lotes}, refs
+
+
+# Lotes and referencias catastrales of each lote, with the engine
+def segment_with_engine(text: str) -> tuple[dict, list]:
+    lotes = segment_lotes(text)
+    refs = [find_refs(lote) for lote in lotes["text"]]
+    return lotes, refs
+
+
+# Returns the result of the function and the best time (seconds) of the repetitions
+def measure(function, text: str, repetitions: int) -> tuple:
+    times = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        result = function(text)
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main(folder: Path, repetitions: int = 3) -> bool:
+    paths = sorted(
+        path
+        for path in folder.iterdir()
+        if path.suffix.lower() in (".pdf", ".txt") and path.is_file()
+    )
+    if not paths:
+        print(f"There are no pliegos ('.pdf' or '.txt') on '{folder}'")
+        return False
+
+    total_findall = total_engine = 0
+    all_identical = True
+    print(f"{'Pliego':<50} {'Lotes':>6} {'findall (s)':>12} {'engine (s)':>12} {'x':>7}")
+    for path in paths:
+        text = read_pliego(path)
+        expected, time_findall = measure(segment_with_findall, text, repetitions)
+        result, time_engine = measure(segment_with_engine, text, repetitions)
+        total_findall += time_findall
+        total_engine += time_engine
+
+        identical = result == expected
+        all_identical &= identical
+        speedup = time_findall / time_engine if time_engine else float("inf")
+        print(
+            f"{path.name[:50]:<50} {len(expected[0]['text']):>6} {time_findall:>12.4f} "
+            f"{time_engine:>12.4f} {speedup:>6.1f}x"
+            f"{'' if identical else '  DIFFERENT RESULTS'}"
+        )
+
+    speedup = total_findall / total_engine if total_engine else float("inf")
+    print(
+        f"\n{len(paths)} pliegos: {total_findall:.4f}s with findall, "
+        f"{total_engine:.4f}s with the engine ({speedup:.1f}x)"
+    )
+    print("Identical results" if all_identical else "The results are DIFFERENT")
+    return all_identical
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(
+            "Usage: python -m Testing.benchmark_lote_segmentation <folder of pliegos> [repetitions]"
+        )
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    sys.exit(0 if main(Path(sys.argv[1]), repetitions) else 1)
@@ -2,9 +2,13 @@ import logging
 import os
 import pickle
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import logger_config
+import pandas as pd
 from Database.helpers import is_auction_old_or_posterior_rounds
+from Driver.driver_pool import DriverPool
+from GoogleMaps.geo import parse_coordinates, rank_by_distance
 from GoogleMaps.GoogleMaps import GoogleMaps
 
 logger = logging.getLogger(__name__)
@@ -51,30 +55,50 @@ def full_get_data_two_directions(
         logger.info(f"{logger_config.build_id(delegation, i_lote, i_land)}{msg}")
         return None
 
-    full_data_two_directions = []
-    for _, enterprise in data_sabi.iterrows():
-        # Check enterprise has the coordinates right in Sa_-_bi
-        # Some have coordinate X = 0 and coordinate Y = 0. So they wont be used to get_data_two_directions()
-        if float(enterprise["Coordenada - Y"]) != 0:
-            enterprise_direction = (
-                f"{enterprise['Coordenada - Y']}, {enterprise["Coordenada - X"]}"
-            )
-            two_directions = GoogleMaps(
-                delegation,
-                i_lote,
-                i_land,
-                land,
-                coordinates_land,  # 'to'
-                enterprise_direction,  # 'from'
-                enterprise["Nombre"],  # 'enterprise'
-            )
-            # Variable that holds a dictionary with 2 keys, each one holds another dictionary with 2 keys.
-            # {"car": {"distance","time"}, "foot": {"distance","time"}}
-            data_two_directions = two_directions.get_data_two_directions()
-            full_data_two_directions.append(
-                {"cif": enterprise["Código NIF"], "data": data_two_directions}
-            )
-    return full_data_two_directions
+    # Check enterprises have the coordinates right in Sa_-_bi
+    # Some have coordinate X = 0 and coordinate Y = 0. So they wont be used to get_data_two_directions()
+    coordinate_y = pd.to_numeric(data_sabi["Coordenada - Y"], errors="coerce")
+    located = data_sabi[coordinate_y.fillna(0) != 0]
+
+    # Only the closest enterprises to the land are routed (see 'GoogleMaps/geo.py')
+    if parse_coordinates(coordinates_land) is None:
+        enterprises = located.to_dict("records")
+        msg = f"Coordinates '{coordinates_land}' of land '{land}' couldn't be read, so its {len(enterprises)} enterprises with coordinates aren't ranked by distance."
+    else:
+        enterprises = rank_by_distance(located, coordinates_land).to_dict("records")
+        msg = f"{len(enterprises)} of the {len(located)} enterprises with coordinates are close enough to land '{land}' to be routed."
+
+    # Log
+    logger.info(f"{logger_config.build_id(delegation, i_lote, i_land)}{msg}")
+
+    if not enterprises:
+        return []
+
+    def get_route(enterprise):
+        enterprise_direction = (
+            f"{enterprise['Coordenada - Y']}, {enterprise['Coordenada - X']}"
+        )
+        two_directions = GoogleMaps(
+            delegation,
+            i_lote,
+            i_land,
+            land,
+            coordinates_land,  # 'to'
+            enterprise_direction,  # 'from'
+            enterprise["Nombre"],  # 'enterprise'
+        )
+        # Variable that holds a dictionary with 2 keys, each one holds another dictionary with 2 keys.
+        # {"car": {"distance","time"}, "foot": {"distance","time"}}
+        data_two_directions = two_directions.get_data_two_directions()
+        return {"cif": enterprise["Código NIF"], "data": data_two_directions}
+
+    # Every route borrows its own browser session, so they are scraped at the same time
+    # (as many as sessions has the driver pool). The results keep the order of the enterprises.
+    with ThreadPoolExecutor(
+        max_workers=min(len(enterprises), DriverPool().size),
+        thread_name_prefix="routes",
+    ) as executor:
+        return list(executor.map(get_route, enterprises))
 
 
 def convert_paths(